@@ -1,7 +1,15 @@
+import time
+_IMPORTS_STARTED_AT = time.perf_counter()
+
 import os
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify
 from flask_cors import CORS
 from core.firebase_setup import initialize_firebase
+from core.db_manager import get_course_cache_stats
+from core.startup_report import report_startup
+from core.config import Config
+from core.media_serving import serve_stored
+from services.processing_jobs import start_processing_workers
 from routes.auth_routes import auth_bp
 from routes.course_routes import course_bp
 from routes.learn_routes import learn_bp
@@ -12,6 +20,8 @@ from routes.media_routes import media_bp
 
 def create_app():
     app = Flask(__name__)
+    # Media/certificate bytes are sent by the front proxy in this mode
+    app.config['USE_X_SENDFILE'] = Config.MEDIA_SENDFILE_MODE == 'x-sendfile'
     
     # 1. CORS Setup 
     # Allowing all origins for development ease, or specify your frontend URL
@@ -31,25 +41,45 @@ def create_app():
     app.register_blueprint(instructor_bp, url_prefix='/api/instructor')
     app.register_blueprint(ai_bp, url_prefix='/api/ai')
     app.register_blueprint(achievement_bp, url_prefix='/api/achievements')
+    app.register_blueprint(media_bp, url_prefix='/media')
+
+    # Catch regressions in worker boot cost (heavy media/AI imports, etc.)
+    report_startup(_IMPORTS_STARTED_AT)
+
+    # 3b. Processing Workers (bounded pool over the durable job queue)
+    # Normally these run in `python -m services.worker`, separate from the API
+    if Config.PROCESSING_WORKERS > 0:
+        start_processing_workers()
+    else:
+        print("ℹ️ Uploads are only queued here. Run `python -m services.worker` to process them.")
 
     # 4. Health Check
     @app.route('/')
     def health_check():
         return jsonify({"status": "running", "service": "SkillChaska Backend v1"}), 200
+
+    # Cache hit/miss counters so we can see how many Firestore reads are saved
+    @app.route('/stats/cache')
+    def cache_stats():
+        return jsonify({"course_cache": get_course_cache_stats()}), 200
     
     # 5. Serve Certificates
     # This route handles: http://localhost:5000/certificates/<uid>/<filename>
     @app.route('/certificates/<uid>/<filename>', methods=['GET'])
     def serve_certificate(uid, filename):
-        # Define the absolute path to the certificates folder
-        base_cert_dir = os.path.join(os.getcwd(), 'certificates')
-        user_cert_dir = os.path.join(base_cert_dir, str(uid))
-        
-        # Check if file exists
-        if os.path.exists(os.path.join(user_cert_dir, filename)):
-            return send_from_directory(user_cert_dir, filename)
-        else:
+        # Certificate ids are unique and the file is never rewritten
+        response = serve_stored('certificates', f"{uid}/{filename}", immutable=True)
+        if response is None:
             return jsonify({"error": "Certificate not found"}), 404
+        return response
+
+    # 6. Serve Avatars (names are unique per upload)
+    @app.route('/avatars/<uid>/<filename>', methods=['GET'])
+    def serve_avatar(uid, filename):
+        response = serve_stored('avatars', f"{uid}/{filename}", immutable=True)
+        if response is None:
+            return jsonify({"error": "Avatar not found"}), 404
+        return response
 
     return app
 
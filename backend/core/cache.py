@@ -0,0 +1,150 @@
+# backend/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with a per-entry time-to-live.
+    Values are returned as stored, so callers must treat them as read-only.
+    on_evict(key) is called (outside the lock) whenever a key leaves the
+    cache: LRU eviction, expiry, invalidate() or clear().
+    """
+
+    def __init__(self, max_size=256, ttl_seconds=300, on_evict=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evicted(self, keys):
+        if self.on_evict:
+            for key in keys:
+                self.on_evict(key)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at >= time.monotonic():
+                # Mark as most recently used
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self._data[key]
+            self.misses += 1
+        self._evicted([key])
+        return None
+
+    def set(self, key, value):
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                evicted.append(self._data.popitem(last=False)[0])
+                self.evictions += 1
+        self._evicted(evicted)
+
+    def peek(self, key):
+        """Like get() but without touching LRU order or the hit/miss counters."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[0] if entry else None
+
+    def refresh(self, key, value):
+        """Replaces a value only if the key is already cached (used by listeners)."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+        self._evicted([key])
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._data)
+            self._data.clear()
+        self._evicted(keys)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0
+            }
+
+
+class ModuleIndex:
+    """
+    module_id -> (course_id, position, module) lookups.
+    Positions are rebuilt once per course snapshot (i.e. whenever the cached
+    course dict is replaced) and are O(1) after that. Both the positions and
+    the module -> course entries of a course are dropped by forget(course_id);
+    wire it to the course cache's on_evict so the index is bounded by, and
+    never outlives, the course cache.
+    """
+
+    def __init__(self):
+        self._module_to_course = {}
+        self._course_modules = {}  # course_id -> module ids in _module_to_course
+        self._course_positions = {}
+        self._lock = threading.Lock()
+
+    def course_id_for(self, module_id):
+        return self._module_to_course.get(module_id)
+
+    def _add(self, course_id, module_id):
+        self._module_to_course[module_id] = course_id
+        self._course_modules.setdefault(course_id, set()).add(module_id)
+
+    def add(self, course_id, module_id):
+        with self._lock:
+            self._add(course_id, module_id)
+
+    def forget(self, course_id):
+        with self._lock:
+            self._course_positions.pop(course_id, None)
+            for module_id in self._course_modules.pop(course_id, ()):
+                self._module_to_course.pop(module_id, None)
+
+    def positions_for(self, course_id, course):
+        """Returns {module_id: position} for this course snapshot."""
+        with self._lock:
+            cached = self._course_positions.get(course_id)
+            if cached is not None and cached[0] is course:
+                return cached[1]
+
+            positions = {}
+            for position, mod in enumerate(course.get('course_modules', [])):
+                module_id = mod.get('module_id')
+                positions[module_id] = position
+                self._add(course_id, module_id)
+            self._course_positions[course_id] = (course, positions)
+            return positions
+
+    def lookup(self, course_id, course, module_id):
+        position = self.positions_for(course_id, course).get(module_id)
+        if position is None:
+            return None
+        return course_id, position, course['course_modules'][position]
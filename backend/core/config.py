@@ -8,4 +8,122 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     FIREBASE_CRED_PATH = "serviceAccountKey.json"
     FIREBASE_WEB_API_KEY = os.getenv('FIREBASE_WEB_API_KEY')
-    FIREBASE_STORAGE_BUCKET = os.getenv('FIREBASE_STORAGE_BUCKET')
\ No newline at end of file
+    FIREBASE_STORAGE_BUCKET = os.getenv('FIREBASE_STORAGE_BUCKET')
+
+    # --- Course Cache ---
+    COURSE_CACHE_MAX_SIZE = int(os.getenv('COURSE_CACHE_MAX_SIZE', 256))
+    COURSE_CACHE_TTL_SECONDS = int(os.getenv('COURSE_CACHE_TTL_SECONDS', 300))
+    # Keeps cached courses fresh when another process edits them (other API workers,
+    # `python -m services.worker` writing module status and media URLs). On: stale for
+    # about a snapshot round trip (~1s). Off: stale for up to COURSE_CACHE_TTL_SECONDS.
+    COURSE_CACHE_LISTENER = os.getenv('COURSE_CACHE_LISTENER', 'true').lower() == 'true'
+
+    # --- Batched Reads ---
+    # Document refs per get_all() call, and how many chunks may be in flight at once
+    FIRESTORE_GET_ALL_CHUNK_SIZE = int(os.getenv('FIRESTORE_GET_ALL_CHUNK_SIZE', 100))
+    FIRESTORE_READ_CONCURRENCY = int(os.getenv('FIRESTORE_READ_CONCURRENCY', 4))
+
+    # --- Write-Behind Buffers ---
+    HEARTBEAT_FLUSH_INTERVAL_SECONDS = float(os.getenv('HEARTBEAT_FLUSH_INTERVAL_SECONDS', 15))
+    # Larger jumps between two heartbeats are treated as seeks, not watch time
+    HEARTBEAT_MAX_DELTA_SECONDS = float(os.getenv('HEARTBEAT_MAX_DELTA_SECONDS', 30))
+    XP_FLUSH_INTERVAL_SECONDS = float(os.getenv('XP_FLUSH_INTERVAL_SECONDS', 2))
+
+    # --- Catalog Pagination ---
+    CATALOG_PAGE_SIZE = int(os.getenv('CATALOG_PAGE_SIZE', 20))
+    CATALOG_MAX_PAGE_SIZE = int(os.getenv('CATALOG_MAX_PAGE_SIZE', 100))
+
+    # --- Firestore Channel ---
+    # 0 = SDK default; with both unset the SDK builds its own channel untouched
+    FIRESTORE_GRPC_KEEPALIVE_MS = int(os.getenv('FIRESTORE_GRPC_KEEPALIVE_MS', 0))
+    FIRESTORE_GRPC_MAX_MESSAGE_MB = int(os.getenv('FIRESTORE_GRPC_MAX_MESSAGE_MB', 0))
+
+    @classmethod
+    def firestore_channel_options(cls):
+        options = []
+        if cls.FIRESTORE_GRPC_KEEPALIVE_MS:
+            options.append(("grpc.keepalive_time_ms", cls.FIRESTORE_GRPC_KEEPALIVE_MS))
+        if cls.FIRESTORE_GRPC_MAX_MESSAGE_MB:
+            size = cls.FIRESTORE_GRPC_MAX_MESSAGE_MB * 1024 * 1024
+            options.append(("grpc.max_send_message_length", size))
+            options.append(("grpc.max_receive_message_length", size))
+        return options
+
+    # --- Startup ---
+    STARTUP_IMPORT_BUDGET_SECONDS = float(os.getenv('STARTUP_IMPORT_BUDGET_SECONDS', 3))
+
+    # --- Processing Jobs ---
+    # Local SQLite file: the API and `python -m services.worker` must share a host (and temp_uploads/)
+    JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join(os.getcwd(), 'job_data', 'processing_jobs.sqlite3'))
+    # Worker threads inside the API process. 0 = API only enqueues and
+    # `python -m services.worker` does the processing.
+    PROCESSING_WORKERS = int(os.getenv('PROCESSING_WORKERS', 0))
+    WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', max(1, (os.cpu_count() or 2) // 2)))
+    WORKER_THREADS_PER_PROCESS = int(os.getenv('WORKER_THREADS_PER_PROCESS', 1))
+    WORKER_SHUTDOWN_GRACE_SECONDS = float(os.getenv('WORKER_SHUTDOWN_GRACE_SECONDS', 60))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_BACKOFF_SECONDS = float(os.getenv('JOB_RETRY_BACKOFF_SECONDS', 30))
+    JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', 300))
+
+    # --- Lecture Rendering ---
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', 2))
+    BROWSER_MAX_RENDERS = int(os.getenv('BROWSER_MAX_RENDERS', 50))  # Recycle Chrome after this many screenshots
+    BROWSER_READY_TIMEOUT_SECONDS = float(os.getenv('BROWSER_READY_TIMEOUT_SECONDS', 15))
+    CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH')  # Skips webdriver_manager when set
+    FFMPEG_BINARY = os.getenv('FFMPEG_BINARY')  # Defaults to imageio-ffmpeg's bundled binary
+    LECTURE_RENDER_MODE = os.getenv('LECTURE_RENDER_MODE', 'still')  # 'still' (12 fps, stillimage tune) or 'standard' (24 fps)
+    LECTURE_X264_PRESET = os.getenv('LECTURE_X264_PRESET', 'veryfast')
+    LECTURE_X264_CRF = int(os.getenv('LECTURE_X264_CRF', 23))
+    PIPELINE_MAX_PARALLEL_STAGES = int(os.getenv('PIPELINE_MAX_PARALLEL_STAGES', 3))
+
+    # --- Voiceover ---
+    TTS_BACKEND = os.getenv('TTS_BACKEND', 'gtts')  # 'gtts' or 'silent' (offline stub)
+    TTS_LANG = os.getenv('TTS_LANG', 'en')
+    TTS_VOICE = os.getenv('TTS_VOICE')  # gTTS regional domain, e.g. 'co.uk'
+    TTS_MAX_CONCURRENCY = int(os.getenv('TTS_MAX_CONCURRENCY', 4))
+    TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(os.getcwd(), 'tts_cache'))
+
+    # --- Uploads ---
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))  # Suggested to clients
+    UPLOAD_MAX_CHUNK_BYTES = int(os.getenv('UPLOAD_MAX_CHUNK_BYTES', 64 * 1024 * 1024))
+    # Sessions with no chunk for this long are deleted (swept when new sessions are created)
+    UPLOAD_SESSION_TTL_SECONDS = int(os.getenv('UPLOAD_SESSION_TTL_SECONDS', 24 * 3600))
+
+    # --- Adaptive Streaming (HLS) ---
+    # Off by default: every upload pays for the whole ladder. Turn on once the
+    # deployed player streams hls_url (Classroom -> VideoPlayer, hls.js / native Safari).
+    HLS_ENABLED = os.getenv('HLS_ENABLED', 'false').lower() == 'true'
+    HLS_LADDER = os.getenv('HLS_LADDER', '1080:5000,720:2800,480:1400,360:800')  # height:video kbps
+    HLS_SEGMENT_SECONDS = int(os.getenv('HLS_SEGMENT_SECONDS', 6))
+    HLS_X264_PRESET = os.getenv('HLS_X264_PRESET', 'veryfast')
+    HLS_MAX_PARALLEL_RENDITIONS = int(os.getenv('HLS_MAX_PARALLEL_RENDITIONS', 4))
+
+    # --- AI Analysis Proxy ---
+    ANALYSIS_PROXY_ENABLED = os.getenv('ANALYSIS_PROXY_ENABLED', 'true').lower() == 'true'
+    ANALYSIS_PROXY_LADDER = os.getenv('ANALYSIS_PROXY_LADDER', '480:2:300,360:1:150,240:1:60')  # height:fps:video kbps
+    ANALYSIS_PROXY_TARGET_MB = float(os.getenv('ANALYSIS_PROXY_TARGET_MB', 200))
+
+    # --- Media Serving ---
+    MEDIA_SENDFILE_MODE = os.getenv('MEDIA_SENDFILE_MODE', '')  # '', 'x-accel' (nginx) or 'x-sendfile'
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected')
+    MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', 3600))
+
+    # --- Storage ---
+    PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://127.0.0.1:5000')  # Prefix of stored media URLs
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local')  # 'local' or 's3'
+    STORAGE_S3_BUCKET = os.getenv('STORAGE_S3_BUCKET')
+    STORAGE_S3_ENDPOINT_URL = os.getenv('STORAGE_S3_ENDPOINT_URL')  # e.g. http://localhost:9000 for MinIO
+    STORAGE_S3_REGION = os.getenv('STORAGE_S3_REGION')
+    STORAGE_S3_ACCESS_KEY_ID = os.getenv('STORAGE_S3_ACCESS_KEY_ID')  # Default AWS credential chain when unset
+    STORAGE_S3_SECRET_ACCESS_KEY = os.getenv('STORAGE_S3_SECRET_ACCESS_KEY')
+    STORAGE_S3_PRESIGN_SECONDS = int(os.getenv('STORAGE_S3_PRESIGN_SECONDS', 3600))
+    STORAGE_S3_MULTIPART_THRESHOLD_MB = int(os.getenv('STORAGE_S3_MULTIPART_THRESHOLD_MB', 16))
+    STORAGE_S3_MULTIPART_CHUNK_MB = int(os.getenv('STORAGE_S3_MULTIPART_CHUNK_MB', 16))
+    STORAGE_S3_MAX_CONCURRENCY = int(os.getenv('STORAGE_S3_MAX_CONCURRENCY', 8))
+
+    # --- Document Extraction ---
+    DOC_PROMPT_BUDGET_CHARS = int(os.getenv('DOC_PROMPT_BUDGET_CHARS', 7000))  # Document text sent to the LLM
+    DOC_EXTRACT_SEQUENTIAL_PAGES = int(os.getenv('DOC_EXTRACT_SEQUENTIAL_PAGES', 4))
+    DOC_EXTRACT_PARALLEL_MIN_PAGES = int(os.getenv('DOC_EXTRACT_PARALLEL_MIN_PAGES', 32))
+    DOC_EXTRACT_WORKERS = int(os.getenv('DOC_EXTRACT_WORKERS', min(4, os.cpu_count() or 1)))
+    DOC_EXTRACT_PAGES_PER_TASK = int(os.getenv('DOC_EXTRACT_PAGES_PER_TASK', 4))
@@ -1,24 +1,231 @@
 import datetime
 import tempfile
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from core.firebase_setup import get_db
+from core.config import Config
+from core.cache import TTLCache, ModuleIndex
+from core.write_behind import HeartbeatBuffer, XPAggregator
+from core.request_memo import MISSING, memo_get, memo_set, memo_invalidate
 from google.cloud import firestore
-from schemas.models import generate_id, get_utc_now
+from schemas.models import generate_id, get_utc_now, CatalogModel, tokenize_search_text
 from core.certificate_template import get_certificate_html # <--- Import new file
-from core.file_handler import upload_file_to_cloud   
+from core.storage import get_storage
+
+# Module fields that live in module_materials/{module_id} instead of modules/{module_id}
+MODULE_HEAVY_FIELDS = ('module_ai_interaction_points', 'module_ai_materials')
+
+# Shared by every DatabaseManager in this process
+module_index = ModuleIndex()
+course_cache = TTLCache(
+    max_size=Config.COURSE_CACHE_MAX_SIZE,
+    ttl_seconds=Config.COURSE_CACHE_TTL_SECONDS,
+    on_evict=module_index.forget  # Positions live exactly as long as the cached course
+)
+materials_cache = TTLCache(
+    max_size=Config.COURSE_CACHE_MAX_SIZE,
+    ttl_seconds=Config.COURSE_CACHE_TTL_SECONDS
+)
+_course_listeners = []
+_heartbeat_buffer = None
+_xp_aggregator = None
+_buffer_lock = threading.Lock()
+_course_listener_lock = threading.Lock()
+
+_db_manager = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager():
+    """
+    The process-wide DatabaseManager, created on first use so importing a
+    blueprint never touches Firebase. Blueprints hold it through a LocalProxy.
+    """
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
+    return _db_manager
+
+def get_course_cache_stats():
+    return {
+        "courses": course_cache.stats(),
+        "module_materials": materials_cache.stats(),
+        "listener_active": bool(_course_listeners)
+    }
+
+def split_module_fields(module_data):
+    """Splits a ModuleModel dict into (light, heavy) documents."""
+    light = {k: v for k, v in module_data.items() if k not in MODULE_HEAVY_FIELDS}
+    heavy = {k: module_data[k] for k in MODULE_HEAVY_FIELDS if k in module_data}
+    return light, heavy
+
+def _is_migrated(user):
+    """
+    True when student_enrollments covers the legacy list. Migration and
+    enroll_student keep the list de-duplicated and the same length as the map,
+    so a shorter map means entries that exist only in the list.
+    """
+    return len(user.get('student_enrollments') or {}) >= len(user.get('student_enrolled_courses') or [])
+
+def _legacy_enrollments(user):
+    enrollments = {}
+    for item in user.get('student_enrolled_courses', []):
+        if isinstance(item, str): # Legacy check
+            item = {"course_id": item, "progress_percent": 0, "is_completed": False, "enrolled_at": None}
+        if isinstance(item, dict) and item.get('course_id'):
+            enrollments.setdefault(item['course_id'], item)
+    return enrollments
+
+def user_enrollments(user):
+    """
+    {course_id: enrollment}: the student_enrollments map, plus the legacy
+    student_enrolled_courses entries for users who were never migrated
+    (scripts/migrate_enrollments.py), so they keep their courses.
+    """
+    enrollments = user.get('student_enrollments') or {}
+    if _is_migrated(user):
+        return enrollments
+    return {**_legacy_enrollments(user), **enrollments}
+
+def user_is_enrolled(user, course_id):
+    """O(1) map lookup; the legacy list is scanned only on a miss for unmigrated users."""
+    if course_id in (user.get('student_enrollments') or {}):
+        return True
+    return not _is_migrated(user) and course_id in _legacy_enrollments(user)
 
 class DatabaseManager:
     def __init__(self):
         self.db = get_db()
         self.users_ref = self.db.collection('users')
         self.courses_ref = self.db.collection('courses')
+        self.modules_ref = self.db.collection('modules')
+        self.materials_ref = self.db.collection('module_materials')
+        self.catalog_ref = self.db.collection('course_catalog')
+        if Config.COURSE_CACHE_LISTENER:
+            self.start_course_cache_listener()
+
+    # --- Course Cache ---
+    def start_course_cache_listener(self):
+        """
+        Watches the courses collection only, so edits made by other workers
+        refresh (or evict) our cached copies instead of waiting for the TTL.
+        Module and materials writes bump course_content_version in the same
+        batch, so their changes arrive here as course changes too.
+        """
+        with _course_listener_lock:
+            if _course_listeners:
+                return
+
+            def on_course_snapshot(col_snapshot, changes, read_time):
+                for change in changes:
+                    course_id = change.document.id
+                    cached = course_cache.peek(course_id)
+                    if cached is None:
+                        continue
+                    data = change.document.to_dict() if change.type.name != 'REMOVED' else None
+                    # Same modules -> keep the assembled modules, refresh the rest
+                    if (data and data.get('course_module_ids') == cached.get('course_module_ids')
+                            and data.get('course_content_version') == cached.get('course_content_version')):
+                        data['course_modules'] = cached.get('course_modules', [])
+                        course_cache.refresh(course_id, data)
+                    else:
+                        course_cache.invalidate(course_id)
+                        for module_id in cached.get('course_module_ids', []):
+                            materials_cache.invalidate(module_id)
+
+            _course_listeners.append(self.courses_ref.on_snapshot(on_course_snapshot))
+            print("👂 Course cache listener started.")
+
+    def invalidate_course(self, course_id):
+        # This process only; other processes rely on the course listener (or the TTL)
+        course_cache.invalidate(course_id)
+        memo_invalidate('courses', course_id)
+
+    def _bump_content_version(self, batch, course_id):
+        """Lets other workers' course listeners see a module or materials write."""
+        batch.update(self.courses_ref.document(course_id), {
+            "course_content_version": firestore.Increment(1)
+        })
+
+    # --- Batched Reads ---
+    def get_documents(self, collection_ref, doc_ids, field_paths=None):
+        """
+        Fetches many documents with get_all() instead of one get() per id.
+        Large id lists are chunked and the chunks are read concurrently.
+        Returns {doc_id: data} for the documents that exist.
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))  # de-duplicate, keep order
+        if not doc_ids:
+            return {}
+
+        size = Config.FIRESTORE_GET_ALL_CHUNK_SIZE
+        chunks = [doc_ids[i:i + size] for i in range(0, len(doc_ids), size)]
+
+        def fetch(chunk):
+            refs = [collection_ref.document(doc_id) for doc_id in chunk]
+            return [(doc.id, doc.to_dict()) for doc in self.db.get_all(refs, field_paths=field_paths) if doc.exists]
+
+        if len(chunks) == 1:
+            return dict(fetch(chunks[0]))
+
+        results = {}
+        workers = min(Config.FIRESTORE_READ_CONCURRENCY, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for pairs in pool.map(fetch, chunks):
+                results.update(pairs)
+        return results
+
+    # --- Write-Behind Buffers ---
+    @property
+    def heartbeat_buffer(self):
+        global _heartbeat_buffer
+        if _heartbeat_buffer is None:
+            with _buffer_lock:
+                if _heartbeat_buffer is None:
+                    buffer = HeartbeatBuffer(
+                        self.db, self.users_ref,
+                        flush_interval=Config.HEARTBEAT_FLUSH_INTERVAL_SECONDS,
+                        max_delta_seconds=Config.HEARTBEAT_MAX_DELTA_SECONDS
+                    )
+                    buffer.start()
+                    _heartbeat_buffer = buffer
+        return _heartbeat_buffer
+
+    @property
+    def xp_aggregator(self):
+        global _xp_aggregator
+        if _xp_aggregator is None:
+            with _buffer_lock:
+                if _xp_aggregator is None:
+                    aggregator = XPAggregator(
+                        self.db, self.users_ref,
+                        flush_interval=Config.XP_FLUSH_INTERVAL_SECONDS
+                    )
+                    aggregator.start()
+                    _xp_aggregator = aggregator
+        return _xp_aggregator
 
     # --- User Operations ---
     def get_user(self, uid):
-        doc = self.users_ref.document(uid).get()
-        if doc.exists:
-            return doc.to_dict()
-        return None
+        """Fetched at most once per request; writes below invalidate the memo."""
+        user = memo_get('users', uid)
+        if user is MISSING:
+            doc = self.users_ref.document(uid).get()
+            user = doc.to_dict() if doc.exists else None
+            memo_set('users', uid, user)
+        return self._with_pending_xp(uid, user)
+
+    def _with_pending_xp(self, uid, user):
+        # XP increments are aggregated before they reach Firestore; show them anyway
+        pending = _xp_aggregator.pending_for(uid) if _xp_aggregator and user else 0
+        if not pending:
+            return user
+        stats = dict(user.get('student_stats', {}))
+        stats['stat_total_xp'] = stats.get('stat_total_xp', 0) + pending
+        return {**user, 'student_stats': stats}
 
     def create_user_if_not_exists(self, user_data):
         uid = user_data['student_id']
@@ -26,6 +233,7 @@ class DatabaseManager:
         doc = doc_ref.get()
         if not doc.exists:
             doc_ref.set(user_data)
+            memo_invalidate('users', uid)
             return user_data, True
         return doc.to_dict(), False
 
@@ -35,36 +243,103 @@ class DatabaseManager:
         doc = doc_ref.get()
         if not doc.exists:
             doc_ref.set(user_data)
+            memo_invalidate('users', uid)
             return user_data, True
         return doc.to_dict(), False
 
     def update_student_profile(self, uid, update_data):
         """Updates bio, social links, name, etc."""
         self.users_ref.document(uid).update(update_data)
+        memo_invalidate('users', uid)
         return self.get_user(uid)
 
     def update_student_avatar(self, uid, url):
         self.users_ref.document(uid).update({"student_avatar_url": url})
+        memo_invalidate('users', uid)
         return url
 
     # --- Course & Module Operations ---
+    # Layout:
+    #   courses/{course_id}           -> course fields + course_module_ids (ordered) + course_module_count
+    #   modules/{module_id}           -> light module fields + module_course_id
+    #   module_materials/{module_id}  -> MODULE_HEAVY_FIELDS + module_course_id
+    #   course_catalog/{course_id}    -> CatalogModel projection for the catalog page
     def create_course(self, course_data):
         course_id = course_data['course_id']
-        self.courses_ref.document(course_id).set(course_data)
+        course_doc = {k: v for k, v in course_data.items() if k != 'course_modules'}
+        course_doc.setdefault('course_module_ids', [])
+        course_doc.setdefault('course_module_count', 0)
+
+        batch = self.db.batch()
+        batch.set(self.courses_ref.document(course_id), course_doc)
+        batch.set(self.catalog_ref.document(course_id), CatalogModel.from_course(course_doc))
+        batch.commit()
+
+        self.invalidate_course(course_id)
         return course_id
 
     def add_module_to_course(self, course_id, module_data):
-        course_ref = self.courses_ref.document(course_id)
-        # Use ArrayUnion to append
-        course_ref.update({
-            "course_modules": firestore.ArrayUnion([module_data])
+        module_id = module_data['module_id']
+        light, heavy = split_module_fields(module_data)
+        light['module_course_id'] = course_id
+        heavy['module_course_id'] = course_id
+
+        # One atomic batch: module doc, materials doc and the course's module list
+        batch = self.db.batch()
+        batch.set(self.modules_ref.document(module_id), light)
+        batch.set(self.materials_ref.document(module_id), heavy)
+        batch.update(self.courses_ref.document(course_id), {
+            "course_module_ids": firestore.ArrayUnion([module_id]),
+            "course_module_count": firestore.Increment(1),
+            "course_content_version": firestore.Increment(1)
         })
+        # merge: courses created before the catalog existed have no projection yet
+        batch.set(self.catalog_ref.document(course_id), {
+            "course_module_count": firestore.Increment(1)
+        }, merge=True)
+        batch.commit()
+
+        self.invalidate_course(course_id)
 
-    def get_all_courses_preview(self):
-        docs = self.courses_ref.where("course_is_published", "==", True).stream()
+    def _paginate_catalog(self, query, fields, limit, cursor, accept=None):
+        """
+        Runs an ordered catalog query one page at a time.
+        Returns (rows, next_cursor). `accept` filters rows in Python; when it
+        rejects rows we keep reading (in page-sized chunks) until the page is full.
+        """
+        limit = max(1, min(int(limit or Config.CATALOG_PAGE_SIZE), Config.CATALOG_MAX_PAGE_SIZE))
+        after = CatalogModel.decode_cursor(cursor) if cursor else None
+        query = query.order_by("course_sort_key", direction=firestore.Query.DESCENDING)
+        fields = list(dict.fromkeys(list(fields) + ["course_sort_key"]))
+
+        rows = []
+        while len(rows) <= limit:
+            page_query = query.select(fields)
+            if after is not None:
+                page_query = page_query.start_after({"course_sort_key": after})
+            # One extra row tells us whether there is a next page
+            docs = list(page_query.limit(limit + 1).stream())
+            for doc in docs:
+                data = doc.to_dict()
+                after = data.get('course_sort_key')
+                if accept is None or accept(data):
+                    rows.append(data)
+            if len(docs) < limit + 1:
+                break  # Query exhausted
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, CatalogModel.encode_cursor(rows[-1]['course_sort_key'])
+        return rows, None
+
+    def get_all_courses_preview(self, limit=None, cursor=None):
+        rows, next_cursor = self._paginate_catalog(
+            self.catalog_ref.where("course_is_published", "==", True),
+            ["course_id", "course_title", "course_description", "course_price_inr", "course_instructor_id"],
+            limit, cursor
+        )
         catalog = []
-        for doc in docs:
-            data = doc.to_dict()
+        for data in rows:
             catalog.append({
                 "course_id": data.get('course_id'),
                 "course_title": data.get('course_title'),
@@ -72,71 +347,148 @@ class DatabaseManager:
                 "course_price_inr": data.get('course_price_inr'),
                 "course_instructor_id": data.get('course_instructor_id')
             })
-        return catalog
+        return catalog, next_cursor
 
     def get_course_full(self, course_id):
-        doc = self.courses_ref.document(course_id).get()
-        return doc.to_dict() if doc.exists else None
+        """
+        Course fields plus its light module list (no AI materials).
+        Read-through cached. The returned dict is shared with other requests,
+        so copy it before modifying.
+        """
+        course = memo_get('courses', course_id)
+        if course is not MISSING:
+            return course
+
+        course = course_cache.get(course_id)
+        if course is None:
+            doc = self.courses_ref.document(course_id).get()
+            if not doc.exists:
+                memo_set('courses', course_id, None)
+                return None
+            course = doc.to_dict()
+            course['course_modules'] = self._load_course_modules(course.get('course_module_ids', []))
+            course_cache.set(course_id, course)
+
+        # Pin this snapshot for the rest of the request
+        memo_set('courses', course_id, course)
+        return course
+
+    def _load_course_modules(self, module_ids):
+        by_id = self.get_documents(self.modules_ref, module_ids)
+        # Keep the course's own ordering
+        return [by_id[mid] for mid in module_ids if mid in by_id]
+
+    def find_module(self, module_id, course_id=None):
+        """
+        Returns (course_id, position, module) or None. The module is the light
+        record only; use get_module_interactions / get_module_materials for the rest.
+        course_id is optional; when given, the module must belong to that course.
+        """
+        if not course_id:
+            course_id = module_index.course_id_for(module_id) or self._find_course_id_for_module(module_id)
+            if not course_id:
+                return None
 
-    def get_module_by_id(self, course_id, module_id):
         course = self.get_course_full(course_id)
-        if course:
-            for mod in course.get('course_modules', []):
-                if mod['module_id'] == module_id:
-                    return mod
-        return None
-    
+        if not course:
+            module_index.forget(course_id)  # Nothing cached to evict it with later
+            return None
+        return module_index.lookup(course_id, course, module_id)
+
+    def _find_course_id_for_module(self, module_id):
+        doc = self.modules_ref.document(module_id).get(field_paths=['module_course_id'])
+        if not doc.exists:
+            return None
+        course_id = doc.get('module_course_id')
+        module_index.add(course_id, module_id)
+        return course_id
+
+    def get_module_by_id(self, course_id, module_id):
+        found = self.find_module(module_id, course_id)
+        return found[2] if found else None
+
+    def _get_module_heavy_doc(self, module_id):
+        heavy = materials_cache.get(module_id)
+        if heavy is not None:
+            return heavy
+        doc = self.materials_ref.document(module_id).get()
+        heavy = doc.to_dict() if doc.exists else {}
+        materials_cache.set(module_id, heavy)
+        return heavy
+
+    def get_module_interactions(self, course_id, module_id):
+        if not self.find_module(module_id, course_id):
+            return []
+        return self._get_module_heavy_doc(module_id).get('module_ai_interaction_points', [])
+
     def get_module_materials(self, course_id, module_id):
-        mod = self.get_module_by_id(course_id, module_id)
-        if mod:
-            return mod.get('module_ai_materials', {})
-        return {}
+        if not self.find_module(module_id, course_id):
+            return {}
+        return self._get_module_heavy_doc(module_id).get('module_ai_materials', {})
 
     # --- Enrollment & Progress ---
     def enroll_student(self, uid, course_id):
+        """
+        Idempotent: enrollments are keyed by course_id in student_enrollments,
+        so enrolling twice never adds a second entry. Returns True if newly enrolled.
+        """
         user_ref = self.users_ref.document(uid)
-        # Add to enrolled list with initial progress
+        # Add to enrolled map with initial progress
         enrollment_obj = {
             "course_id": course_id,
             "progress_percent": 0,
             "is_completed": False,
             "enrolled_at": get_utc_now()
         }
-        user_ref.update({
-            "student_enrolled_courses": firestore.ArrayUnion([enrollment_obj])
-        })
+
+        @firestore.transactional
+        def enroll_in_transaction(transaction):
+            snapshot = user_ref.get(transaction=transaction)
+            data = snapshot.to_dict() or {}
+            if user_is_enrolled(data, course_id):
+                return False
+
+            fields = {
+                # Kept (de-duplicated) for clients that still read the list
+                "student_enrolled_courses": firestore.ArrayUnion([enrollment_obj])
+            }
+            if _is_migrated(data):
+                fields[f"student_enrollments.{course_id}"] = enrollment_obj
+            else:
+                # Unmigrated user: seed the map from the legacy list, or it would hide those courses
+                fields["student_enrollments"] = {**user_enrollments(data), course_id: enrollment_obj}
+            transaction.update(user_ref, fields)
+            return True
+
+        enrolled = enroll_in_transaction(self.db.transaction())
+        memo_invalidate('users', uid)
+        return enrolled
 
     def is_student_enrolled(self, uid, course_id):
         user = self.get_user(uid)
         if not user: return False
-        # Check in array
-        for item in user.get('student_enrolled_courses', []):
-            if isinstance(item, dict) and item.get('course_id') == course_id:
-                return True
-            if isinstance(item, str) and item == course_id: # Legacy check
-                return True
-        return False
+        return user_is_enrolled(user, course_id)
 
     def update_learning_heartbeat(self, user_id, course_id, module_id, timestamp):
-        user_ref = self.users_ref.document(user_id)
-        
-        # 1. Update Detailed Progress
-        key = f"student_learning_progress.{course_id}"
-        user_ref.update({
-            f"{key}.last_accessed_module_id": module_id,
-            f"{key}.last_timestamp_seconds": timestamp,
-            f"{key}.last_updated_at": firestore.SERVER_TIMESTAMP
-        })
+        """
+        Buffered: only the latest position per (user, course) is kept and written
+        in batches every HEARTBEAT_FLUSH_INTERVAL_SECONDS, along with watch time.
+        """
+        self.heartbeat_buffer.record(user_id, course_id, module_id, timestamp)
 
-        # 2. Update Course % (Simple Logic: Count unique modules accessed / Total Modules)
-        # In a real app, you'd calculate this strictly. Here we mock increment logic or rely on 'completed_modules' set.
-        # For now, we assume frontend or separate logic marks modules as complete.
+    def _get_course_progress(self, user, uid, course_id):
+        """Stored progress for a course with any unflushed heartbeat applied."""
+        progress = dict(user.get('student_learning_progress', {}).get(course_id) or {})
+        pending = self.heartbeat_buffer.peek(uid, course_id) if _heartbeat_buffer else None
+        if pending:
+            progress['last_accessed_module_id'] = pending['module_id']
+            progress['last_timestamp_seconds'] = pending['timestamp']
+        return progress
 
     def get_course_resume_point(self, user_id, course_id):
-        user_doc = self.users_ref.document(user_id).get()
-        if not user_doc.exists: return None
-        data = user_doc.to_dict()
-        progress = data.get('student_learning_progress', {}).get(course_id)
+        data = self.get_user(user_id)
+        if not data: return None
+        progress = self._get_course_progress(data, user_id, course_id)
         if progress:
             return {
                 "module_id": progress.get('last_accessed_module_id'),
@@ -149,17 +501,15 @@ class DatabaseManager:
         pass
 
     def increment_student_xp(self, uid, amount):
-        user_ref = self.users_ref.document(uid)
-        user_ref.update({"student_stats.stat_total_xp": firestore.Increment(amount)})
+        # Aggregated in memory and flushed every XP_FLUSH_INTERVAL_SECONDS
+        self.xp_aggregator.record(uid, amount)
         return amount
 
-    def get_correct_answer(self, module_id, interaction_id):
-        # Scan all courses is inefficient, in prod use module_id query.
-        # Here assuming we have context, but for MVP we search:
-        # NOTE: This implementation assumes you know the course_id. 
-        # Ideally, pass course_id to this function. 
-        # For simplicity, returning a mock or needing refactor if course_id is missing.
-        return "Option A", "Mock Feedback" # Needs course_id to find efficiently
+    def get_correct_answer(self, module_id, interaction_id, course_id=None):
+        for point in self.get_module_interactions(course_id, module_id):
+            if point.get('interaction_id') == interaction_id:
+                return point.get('interaction_correct_option'), point.get('interaction_hint_text', '')
+        return None, "Question not found"
 
     # --- Instructor & AI ---
     def update_module_status(self, course_id, module_id, status_message, percent_complete):
@@ -170,32 +520,83 @@ class DatabaseManager:
             "updated_at": firestore.SERVER_TIMESTAMP
         }, merge=True)
 
-    def update_module_video_url(self, course_id, module_id, public_url):
-        course_ref = self.courses_ref.document(course_id)
-        doc = course_ref.get()
-        if doc.exists:
-            data = doc.to_dict()
-            modules = data.get('course_modules', [])
-            for mod in modules:
-                if mod['module_id'] == module_id:
-                    mod['module_media_url'] = public_url
-                    break
-            course_ref.update({"course_modules": modules})
+    def record_processing_stats(self, module_id, stage, stats):
+        """Keeps a stage's diagnostics next to the status, e.g. stats.extraction."""
+        self.db.collection('processing_logs').document(module_id).set({
+            "stats": {stage: stats}
+        }, merge=True)
+
+    def acquire_module_lease(self, module_id, owner, ttl_seconds):
+        """
+        Cross-node lock so only one worker processes a module at a time.
+        Re-acquiring with the same owner renews the lease.
+        """
+        lock_ref = self.db.collection('processing_locks').document(module_id)
+
+        @firestore.transactional
+        def take(transaction):
+            snapshot = lock_ref.get(transaction=transaction)
+            now = time.time()
+            if snapshot.exists:
+                data = snapshot.to_dict()
+                if data.get('owner') != owner and data.get('expires_at', 0) > now:
+                    return False
+            transaction.set(lock_ref, {
+                "owner": owner,
+                "expires_at": now + ttl_seconds,
+                "updated_at": firestore.SERVER_TIMESTAMP
+            })
+            return True
+
+        return take(self.db.transaction())
+
+    def release_module_lease(self, module_id, owner):
+        lock_ref = self.db.collection('processing_locks').document(module_id)
+
+        @firestore.transactional
+        def release(transaction):
+            snapshot = lock_ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get('owner') == owner:
+                transaction.delete(lock_ref)
+
+        release(self.db.transaction())
+
+    def get_content_artifacts(self, content_hash):
+        doc = self.db.collection('content_index').document(content_hash).get()
+        return doc.to_dict() if doc.exists else None
+
+    def record_content_artifacts(self, content_hash, artifacts):
+        """Remembers what processing these source bytes produced, for reuse."""
+        self.db.collection('content_index').document(content_hash).set({
+            **artifacts,
+            "content_hash": content_hash,
+            "updated_at": firestore.SERVER_TIMESTAMP
+        })
+
+    def update_module_video_url(self, course_id, module_id, public_url, hls_url=None):
+        # Field update on the module doc, no read-modify-write
+        fields = {"module_media_url": public_url}
+        if hls_url:
+            fields['module_media_hls_url'] = hls_url
+        batch = self.db.batch()
+        batch.update(self.modules_ref.document(module_id), fields)
+        self._bump_content_version(batch, course_id)
+        batch.commit()
+        self.invalidate_course(course_id)
 
     def update_module_ai_data(self, course_id, module_id, ai_interaction_list, ai_materials=None):
-        course_ref = self.courses_ref.document(course_id)
-        doc = course_ref.get()
-        if doc.exists:
-            data = doc.to_dict()
-            modules = data.get('course_modules', [])
-            for mod in modules:
-                if mod['module_id'] == module_id:
-                    mod['module_ai_interaction_points'] = ai_interaction_list
-                    if ai_materials:
-                        mod['module_ai_materials'] = ai_materials
-                    mod['module_status'] = 'ready_for_review'
-                    break
-            course_ref.update({"course_modules": modules})
+        heavy = {"module_ai_interaction_points": ai_interaction_list}
+        if ai_materials:
+            heavy['module_ai_materials'] = ai_materials
+
+        batch = self.db.batch()
+        batch.set(self.materials_ref.document(module_id), heavy, merge=True)
+        batch.update(self.modules_ref.document(module_id), {"module_status": 'ready_for_review'})
+        self._bump_content_version(batch, course_id)
+        batch.commit()
+
+        materials_cache.invalidate(module_id)
+        self.invalidate_course(course_id)
 
     # --- Certificates & Badges ---
     def get_all_badges(self):
@@ -212,26 +613,19 @@ class DatabaseManager:
         ]
 
     def get_certificates_by_ids(self, cert_ids):
-        certs = []
-        for cid in cert_ids:
-            doc = self.db.collection('certificates').document(cid).get()
-            if doc.exists:
-                certs.append(doc.to_dict())
-        return certs
+        by_id = self.get_documents(self.db.collection('certificates'), cert_ids)
+        return [by_id[cid] for cid in dict.fromkeys(cert_ids) if cid in by_id]
     
     def get_user_module_progress(self, uid, course_id, module_id):
         """
         Retrieves resume progress for a specific module based on
         StudentEntity.student_learning_progress schema.
         """
-        user_doc = self.users_ref.document(uid).get()
-        if not user_doc.exists:
+        data = self.get_user(uid)
+        if not data:
             return {"last_timestamp": 0}
 
-        data = user_doc.to_dict() or {}
-
-        progress_map = data.get("student_learning_progress", {})
-        course_progress = progress_map.get(course_id)
+        course_progress = self._get_course_progress(data, uid, course_id)
 
         # No progress recorded for this course
         if not course_progress:
@@ -266,22 +660,15 @@ class DatabaseManager:
         # 2. Generate HTML (Assuming get_certificate_html is imported)
         html_content = get_certificate_html(student_name, course_name, issue_date, cert_id)
     
-        # 3. Save Locally on the Server
-        # Use os.getcwd() to ensure we are relative to the running script
-        base_cert_path = os.path.join(os.getcwd(), 'certificates') 
-        cert_dir = os.path.join(base_cert_path, str(uid))
-        
-        os.makedirs(cert_dir, exist_ok=True)  # Create folders if they don't exist
-    
+        # 3. Save to Storage (local disk or the shared bucket)
         cert_filename = f"{cert_id}_cert.html"
-        cert_path = os.path.join(cert_dir, cert_filename)
+        cert_path = f"{uid}/{cert_filename}"
     
         try:
-            with open(cert_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"Certificate saved at: {cert_path}")
+            get_storage().save_bytes(html_content.encode('utf-8'), 'certificates', cert_path, 'text/html')
+            print(f"Certificate saved at: certificates/{cert_path}")
         except Exception as e:
-            print(f"Error saving certificate locally: {e}")
+            print(f"Error saving certificate: {e}")
             raise e
         
         # 4. Create Record
@@ -299,6 +686,7 @@ class DatabaseManager:
         self.users_ref.document(uid).update({
             "student_stats.stat_certificates_earned": firestore.ArrayUnion([cert_id])
         })
+        memo_invalidate('users', uid)
         self.db.collection('certificates').document(cert_id).set(cert_data)
     
         return cert_data
@@ -313,20 +701,18 @@ class DatabaseManager:
             print(f"❌ Course {course_id} not found")
             return False
             
-        course_modules = course.get('course_modules', [])
-        total_modules_count = len(course_modules)
+        total_modules_count = course.get('course_module_count', len(course.get('course_modules', [])))
         
         if total_modules_count == 0:
             return False
 
-        # 2. Get User Progress (FORCE FRESH FETCH)
-        # We access the document directly to ensure we aren't using cached data
-        user_doc = self.users_ref.document(uid).get()
-        if not user_doc.exists:
+        # 2. Get User Progress
+        # Any progress write earlier in this request has invalidated the memo,
+        # so this is a fresh read in that case
+        user_data = self.get_user(uid)
+        if not user_data:
             print(f"❌ User {uid} not found")
             return False
-            
-        user_data = user_doc.to_dict()
 
         # 3. Retrieve Progress Data
         progress_map = user_data.get('student_learning_progress', {})
@@ -346,47 +732,87 @@ class DatabaseManager:
             
         return False
 
-    def get_courses_filtered(self, search_query=None, level=None, uid=None):
+    def get_courses_filtered(self, search_query=None, level=None, uid=None, limit=None, cursor=None):
         """
-        Fetches courses and injects 'course_progress' if a uid is provided.
+        Fetches one page of courses from the compact catalog projection and
+        injects 'course_progress' if a uid is provided. Returns (courses, next_cursor).
+        Level and the most selective search term are filtered by Firestore
+        (needs composite indexes on course_is_published [+ course_level]
+        [+ course_search_terms] + course_sort_key desc); any remaining search
+        terms are checked here.
         """
-        query = self.courses_ref.where("course_is_published", "==", True)
-        docs = query.stream()
+        query = self.catalog_ref.where("course_is_published", "==", True)
+        if level:
+            query = query.where("course_level", "==", level)
 
-        # 1. If User ID provided, fetch their progress map
+        search_terms = tokenize_search_text(search_query)
+        fields = list(CatalogModel.PREVIEW_FIELDS)
+        accept = None
+        if search_terms:
+            query = query.where("course_search_terms", "array_contains", max(search_terms, key=len))
+            fields.append("course_search_terms")
+
+            def accept(data):
+                terms = set(data.get('course_search_terms', []))
+                return all(t in terms for t in search_terms)
+
+        rows, next_cursor = self._paginate_catalog(query, fields, limit, cursor, accept)
+
+        # If User ID provided, fetch their progress map
         user_progress_map = {}
         if uid:
             user = self.get_user(uid)
             if user:
                 user_progress_map = user.get('student_learning_progress', {})
 
-        results = []
-        for doc in docs:
-            data = doc.to_dict()
-            c_id = data.get('course_id')
-            
-            # 2. Calculate Progress dynamically
-            progress_percent = 0
-            if uid and c_id in user_progress_map:
-                completed_modules = user_progress_map[c_id].get('completed_modules', [])
-                total_modules = len(data.get('course_modules', []))
-                if total_modules > 0:
-                    progress_percent = int((len(completed_modules) / total_modules) * 100)
-
-            results.append({
-                "course_id": c_id,
-                "course_title": data.get('course_title'),
-                "course_description": data.get('course_description'),
-                "course_price_inr": data.get('course_price_inr'),
-                "course_instructor_id": data.get('course_instructor_id'),
-                "course_thumbnail_url": data.get('course_thumbnail_url', ''),
-                "course_level": data.get('course_level', 'Beginner'),
-                "course_difficulty": data.get('course_level', 'Beginner'), # Map level to difficulty
-                "course_total_modules": len(data.get('course_modules', [])),
-                "course_progress": progress_percent # <--- Injected Real Data
-            })
+        results = [self._course_card(data, user_progress_map) for data in rows]
+        return results, next_cursor
+
+    def _course_card(self, data, user_progress_map):
+        c_id = data.get('course_id')
+
+        # Calculate Progress dynamically
+        progress_percent = 0
+        if c_id in user_progress_map:
+            completed_modules = user_progress_map[c_id].get('completed_modules', [])
+            total_modules = data.get('course_module_count', 0)
+            if total_modules > 0:
+                progress_percent = int((len(completed_modules) / total_modules) * 100)
+
+        return {
+            "course_id": c_id,
+            "course_title": data.get('course_title'),
+            "course_description": data.get('course_description'),
+            "course_price_inr": data.get('course_price_inr'),
+            "course_instructor_id": data.get('course_instructor_id'),
+            "course_thumbnail_url": data.get('course_thumbnail_url', ''),
+            "course_level": data.get('course_level', 'Beginner'),
+            "course_difficulty": data.get('course_level', 'Beginner'), # Map level to difficulty
+            "course_total_modules": data.get('course_module_count', 0),
+            "course_progress": progress_percent # <--- Injected Real Data
+        }
 
-        return results
+    def get_enrolled_courses(self, uid):
+        """
+        Course cards for every course the user is enrolled in.
+        Already-cached courses are reused, the rest come from one batched read.
+        """
+        user = self.get_user(uid)
+        if not user:
+            return []
+
+        course_ids = list(user_enrollments(user).keys())
+
+        by_id = {}
+        for c_id in course_ids:
+            cached = course_cache.peek(c_id)
+            if cached is not None:
+                by_id[c_id] = cached
+        missing = [c_id for c_id in course_ids if c_id not in by_id]
+        by_id.update(self.get_documents(self.catalog_ref, missing, field_paths=CatalogModel.PREVIEW_FIELDS))
+
+        user_progress_map = user.get('student_learning_progress', {})
+        return [self._course_card(by_id[c_id], user_progress_map) for c_id in course_ids if c_id in by_id]
 
     def mark_module_completed(self, uid, course_id, module_id):
         """
@@ -400,4 +826,5 @@ class DatabaseManager:
             key: firestore.ArrayUnion([module_id]),
             f"student_learning_progress.{course_id}.last_updated_at": firestore.SERVER_TIMESTAMP
         })
+        memo_invalidate('users', uid)
         return True
\ No newline at end of file
@@ -1,8 +1,12 @@
+import threading
 import firebase_admin
 from firebase_admin import credentials, firestore, auth, storage
 from core.config import Config
 import os
 
+_db_client = None
+_db_lock = threading.Lock()
+
 def initialize_firebase():
     if not firebase_admin._apps:
         if not os.path.exists(Config.FIREBASE_CRED_PATH):
@@ -14,12 +18,46 @@ def initialize_firebase():
         })
 
 def get_db():
-    return firestore.client()
+    """
+    One Firestore client (and gRPC channel) per process, created on first use.
+    """
+    global _db_client
+    if _db_client is None:
+        with _db_lock:
+            if _db_client is None:
+                initialize_firebase()
+                _db_client = _create_firestore_client()
+    return _db_client
+
+def _create_firestore_client():
+    client = firestore.client()
+    options = Config.firestore_channel_options()
+    if not options:
+        return client
+    if client._emulator_host:
+        # The SDK wires the emulator's insecure channel itself
+        print("⚠️ FIRESTORE_EMULATOR_HOST is set, ignoring Firestore channel options")
+        return client
+
+    # Same wiring the client does lazily on first call, but with our channel options
+    from google.cloud.firestore_v1.services.firestore import FirestoreClient
+    from google.cloud.firestore_v1.services.firestore.transports.grpc import FirestoreGrpcTransport
+    channel = FirestoreGrpcTransport.create_channel(
+        client._target, credentials=client._credentials, options=options
+    )
+    client._firestore_api_internal = FirestoreClient(
+        transport=FirestoreGrpcTransport(channel=channel),
+        client_options=client._client_options,
+        client_info=client._client_info
+    )
+    return client
 
 def get_auth():
+    initialize_firebase()
     return auth
 
 def get_storage_bucket():
     """Returns the default storage bucket object"""
     # Make sure 'storageBucket' is defined in your firebase config or init
-    return storage.bucket()
\ No newline at end of file
+    initialize_firebase()
+    return storage.bucket()
@@ -1,27 +1,34 @@
 # backend/core/local_file_handler.py
+import hashlib
 import os
+from core.config import Config
 
 # Base directory for all course media, relative to the backend's root
+# (the 'media' area of the local storage backend, see core/storage.py)
 MEDIA_ROOT = os.path.join(os.getcwd(), 'media_storage')
 os.makedirs(MEDIA_ROOT, exist_ok=True)
 
-def save_file_locally(temp_file_path, course_id, module_id, original_filename):
+def save_stream_hashed(stream, dest_path, chunk_size=1024 * 1024):
     """
-    Saves a file from a temporary path to the final local media directory
-    and returns the web-accessible URL path.
+    Writes an upload stream to dest_path, hashing it on the way.
+    Returns the sha256 hex digest of the bytes written.
     """
-    # 1. Create the final directory structure
-    final_dir = os.path.join(MEDIA_ROOT, course_id, module_id)
-    os.makedirs(final_dir, exist_ok=True)
-    
-    # 2. Define the final file path
-    final_path = os.path.join(final_dir, original_filename)
+    digest = hashlib.sha256()
+    with open(dest_path, 'wb') as out:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
 
-    # 3. Move the file from temp to final location
-    os.rename(temp_file_path, final_path)
+def media_relative_path(course_id, module_id, filename):
+    return f"{course_id}/{module_id}/{filename}"
 
-    # 4. Construct the URL path that the frontend will use
-    # Example: /media/course_123/mod_abc/video.mp4
-    url_path = f"/media/{course_id}/{module_id}/{original_filename}"
-    
-    return url_path
\ No newline at end of file
+def public_media_url(course_id, module_id, filename):
+    """
+    The URL the frontend uses, served by media_routes on any API node.
+    Example: http://127.0.0.1:5000/media/course_123/mod_abc/video.mp4
+    """
+    return f"{Config.PUBLIC_BASE_URL}/media/{media_relative_path(course_id, module_id, filename)}"
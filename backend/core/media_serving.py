@@ -0,0 +1,86 @@
+# backend/core/media_serving.py
+"""
+File responses for lecture media, certificates and avatars.
+
+With the S3 storage backend, reads are redirects to presigned URLs (HLS
+playlists excepted, see serve_stored). With local storage the default mode
+streams from Python with byte ranges, strong ETags, Last-Modified and 304s
+(Flask's conditional send_file). With MEDIA_SENDFILE_MODE a front proxy
+sends the bytes instead and Python only resolves and checks the path:
+
+    'x-accel'    nginx: X-Accel-Redirect to an internal location per area, e.g.
+                     location /protected/media/ { internal; alias /srv/backend/media_storage/; }
+                     location /protected/certificates/ { internal; alias /srv/backend/certificates/; }
+                     location /protected/avatars/ { internal; alias /srv/backend/avatars/; }
+    'x-sendfile' Apache mod_xsendfile / lighttpd (Flask's USE_X_SENDFILE)
+
+Callers that never overwrite a path (certificates, avatars: new file, new
+name) pass immutable=True; lecture media keeps its name across reprocessing,
+so it gets MEDIA_CACHE_MAX_AGE and is revalidated by ETag.
+"""
+import mimetypes
+import os
+from flask import make_response, redirect, send_file
+from core.config import Config
+from core.storage import get_storage
+
+# Not registered everywhere (and .ts is sometimes TypeScript)
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/mp2t', '.ts')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def serve_stored(area, relative_path, immutable=False):
+    """Response for a file in a storage area, or None if there is no such file."""
+    storage = get_storage()
+    url = storage.presigned_url(area, relative_path)
+    if url:
+        # Presigning never checks the key; a missing file must be our 404, not the bucket's 403
+        if not storage.file_exists(area, relative_path):
+            return None
+        if relative_path.endswith('.m3u8'):
+            # Playlists are tiny and name their segments relatively; serving
+            # them here keeps those relative to this route, which redirects each one
+            try:
+                data = storage.read_bytes(area, relative_path)
+            except Exception as e:
+                print(f"⚠️ Could not read {area}/{relative_path}: {e}")
+                return None
+            response = make_response(data)
+            response.headers['Content-Type'] = mimetypes.guess_type(relative_path)[0]
+            response.cache_control.public = True
+            response.cache_control.max_age = Config.MEDIA_CACHE_MAX_AGE
+            return response
+        response = redirect(url, 302)
+        # Never let a cached redirect outlive its signature
+        response.cache_control.private = True
+        response.cache_control.max_age = min(Config.MEDIA_CACHE_MAX_AGE, Config.STORAGE_S3_PRESIGN_SECONDS // 2)
+        return response
+
+    path = storage.local_path(area, relative_path)
+    if path is None or not os.path.isfile(path):
+        return None
+    return serve_file(path, f"{area}/{relative_path}", immutable)
+
+
+def serve_file(path, accel_path, immutable=False):
+    """
+    Response for a local file. accel_path is its location below
+    MEDIA_ACCEL_REDIRECT_PREFIX for nginx.
+    """
+    max_age = IMMUTABLE_MAX_AGE if immutable else Config.MEDIA_CACHE_MAX_AGE
+
+    if Config.MEDIA_SENDFILE_MODE == 'x-accel':
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = f"{Config.MEDIA_ACCEL_REDIRECT_PREFIX}/{accel_path}"
+        response.headers['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        # Range, ETag, Last-Modified, 304s; X-Sendfile when USE_X_SENDFILE is on
+        response = send_file(path, conditional=True, etag=True, max_age=max_age)
+
+    if immutable:
+        response.cache_control.immutable = True
+    return response
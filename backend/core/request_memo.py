@@ -0,0 +1,32 @@
+# backend/core/request_memo.py
+"""
+Request-scoped identity map for Firestore documents.
+Lives on flask.g, so it is thrown away when the request ends. Outside of a
+request (background threads, scripts) every call is a no-op / miss.
+"""
+from flask import g, has_request_context
+
+MISSING = object()
+
+def _memo():
+    if not has_request_context():
+        return None
+    if not hasattr(g, '_doc_memo'):
+        g._doc_memo = {}
+    return g._doc_memo
+
+def memo_get(collection, doc_id):
+    memo = _memo()
+    if memo is None:
+        return MISSING
+    return memo.get((collection, doc_id), MISSING)
+
+def memo_set(collection, doc_id, value):
+    memo = _memo()
+    if memo is not None:
+        memo[(collection, doc_id)] = value
+
+def memo_invalidate(collection, doc_id):
+    memo = _memo()
+    if memo is not None:
+        memo.pop((collection, doc_id), None)
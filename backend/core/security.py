@@ -1,10 +1,7 @@
 from functools import wraps
 from flask import request, jsonify, g
 from firebase_admin import auth
-from core.firebase_setup import initialize_firebase
-
-# Ensure firebase is ready
-initialize_firebase()
+from core.firebase_setup import get_auth
 
 def require_token(f):
     """
@@ -21,8 +18,8 @@ def require_token(f):
         token = auth_header.split("Bearer ")[1]
         
         try:
-            # Verify token with Firebase
-            decoded_token = auth.verify_id_token(token)
+            # Verify token with Firebase (initialised on first use)
+            decoded_token = get_auth().verify_id_token(token)
             g.user_uid = decoded_token['uid']
             g.user_email = decoded_token.get('email')
             g.token_payload = decoded_token
@@ -37,6 +34,20 @@ def require_token(f):
 
     return decorated_function
 
+def get_optional_uid():
+    """
+    For hybrid routes that guests can see too: the caller's uid if a valid
+    Bearer token was sent, otherwise None.
+    """
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith("Bearer "):
+        try:
+            token = auth_header.split("Bearer ")[1]
+            return get_auth().verify_id_token(token)['uid']
+        except Exception:
+            pass # Invalid token, treat as guest
+    return None
+
 def require_role(role_name):
     """
     Decorator to enforce RBAC (e.g., @require_role('instructor'))
@@ -0,0 +1,95 @@
+# backend/core/startup_report.py
+"""
+Keeps an eye on API worker boot cost.
+
+- report_startup(started_at) is called by create_app() and prints import time,
+  peak RSS and any heavy media/AI module that got imported eagerly.
+- `python -m core.startup_report` imports the app in a fresh interpreter with
+  -X importtime, prints the most expensive imports and exits non-zero when a
+  heavy module is imported at startup or the import budget is exceeded (for CI).
+"""
+import os
+import subprocess
+import sys
+import time
+from core.config import Config
+
+# Only processing jobs and the AI tutor may import these
+HEAVY_MODULES = (
+    'moviepy', 'selenium', 'webdriver_manager', 'weasyprint',
+    'PyPDF2', 'gtts', 'google.genai', 'numpy', 'imageio'
+)
+
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        return None
+
+def eagerly_loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+def report_startup(started_at):
+    elapsed = time.perf_counter() - started_at
+    heavy = eagerly_loaded_heavy_modules()
+    print(f"⏱️ Startup imports: {elapsed:.2f}s | peak RSS: {_peak_rss_mb()} MB")
+    if heavy:
+        print(f"⚠️ Heavy modules imported at startup: {', '.join(heavy)}")
+    if elapsed > Config.STARTUP_IMPORT_BUDGET_SECONDS:
+        print(f"⚠️ Startup imports over budget ({Config.STARTUP_IMPORT_BUDGET_SECONDS}s)")
+    return {"import_seconds": round(elapsed, 3), "peak_rss_mb": _peak_rss_mb(), "heavy_modules": heavy}
+
+def _parse_importtime(stderr):
+    """
+    Returns [(cumulative_us, depth, module)] from -X importtime output.
+    The name column is indented two spaces per nesting level; depth 0 rows are
+    the top-level imports, whose cumulative times add up without overlap.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3:
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((int(parts[1].strip()), depth, name.strip()))
+    return rows
+
+def main(top=15):
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = (
+        "import app, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=backend_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        return result.returncode
+
+    rows = _parse_importtime(result.stderr)
+    total_seconds = sum(us for us, depth, _ in rows if depth == 0) / 1e6
+
+    print(f"Top {top} imports by cumulative time:")
+    for us, _, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+    print(f"Total: {total_seconds:.2f}s (budget {Config.STARTUP_IMPORT_BUDGET_SECONDS}s)")
+
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    failed = False
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if total_seconds > Config.STARTUP_IMPORT_BUDGET_SECONDS:
+        print("❌ Startup import budget exceeded")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# backend/core/storage.py
+"""
+One storage interface for everything the backend writes and serves.
+
+Files live in named areas ('media', 'certificates', 'avatars') under a path
+such as 'course_1/mod_2/lecture.mp4'. Two backends (Config.STORAGE_BACKEND):
+
+    local  directories on this machine (media_storage/, certificates/, ...)
+    s3     one S3-compatible bucket, keys '<area>/<path>'. STORAGE_S3_ENDPOINT_URL
+           points it at MinIO or another stand-in. Reads are served as
+           presigned-URL redirects, so any API node can serve any file.
+
+Paths may name a single file or a "directory" (everything under path/), e.g.
+an HLS ladder.
+"""
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import safe_join
+from core.config import Config
+from core.local_file_handler import MEDIA_ROOT
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def _link_or_copy(source, dest):
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+class LocalStorage:
+    def __init__(self, areas):
+        self.areas = areas  # {area: directory}
+        for directory in areas.values():
+            os.makedirs(directory, exist_ok=True)
+
+    def local_path(self, area, path):
+        """Absolute path for area/path, or None if it would escape the area."""
+        return safe_join(self.areas[area], path)
+
+    def _dest(self, area, path):
+        dest = self.local_path(area, path)
+        if dest is None:
+            raise ValueError(f"Invalid storage path: {path}")
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        return dest
+
+    def save_file(self, local_path, area, path, content_type=None):
+        # Hard link: no bytes are copied on the same filesystem
+        dest = self._dest(area, path)
+        if os.path.exists(dest):
+            os.remove(dest)
+        _link_or_copy(local_path, dest)
+
+    def save_bytes(self, data, area, path, content_type=None):
+        with open(self._dest(area, path), 'wb') as f:
+            f.write(data)
+
+    def save_tree(self, local_dir, area, path):
+        dest = self._dest(area, path)
+        shutil.rmtree(dest, ignore_errors=True)
+        shutil.copytree(local_dir, dest, copy_function=_link_or_copy)
+
+    def exists(self, area, path):
+        full_path = self.local_path(area, path)
+        return full_path is not None and os.path.exists(full_path)
+
+    def file_exists(self, area, path):
+        full_path = self.local_path(area, path)
+        return full_path is not None and os.path.isfile(full_path)
+
+    def copy(self, area, source_path, dest_path):
+        source = self.local_path(area, source_path)
+        if os.path.abspath(source) == os.path.abspath(self._dest(area, dest_path)):
+            return
+        if os.path.isdir(source):
+            self.save_tree(source, area, dest_path)
+        else:
+            self.save_file(source, area, dest_path)
+
+    def read_bytes(self, area, path):
+        with open(self.local_path(area, path), 'rb') as f:
+            return f.read()
+
+    def presigned_url(self, area, path):
+        return None  # Served from disk by the route itself
+
+
+class S3Storage:
+    def __init__(self, bucket, endpoint_url=None, region=None):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config as BotoConfig
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=Config.STORAGE_S3_ACCESS_KEY_ID,
+            aws_secret_access_key=Config.STORAGE_S3_SECRET_ACCESS_KEY,
+            # Path-style addressing works with MinIO and other stand-ins
+            config=BotoConfig(signature_version='s3v4', s3={'addressing_style': 'path' if endpoint_url else 'auto'})
+        )
+        mb = 1024 * 1024
+        # Files above the threshold are streamed from disk as parallel multipart uploads
+        self.transfer_config = TransferConfig(
+            multipart_threshold=Config.STORAGE_S3_MULTIPART_THRESHOLD_MB * mb,
+            multipart_chunksize=Config.STORAGE_S3_MULTIPART_CHUNK_MB * mb,
+            max_concurrency=Config.STORAGE_S3_MAX_CONCURRENCY
+        )
+
+    @staticmethod
+    def _key(area, path):
+        return f"{area}/{path.strip('/')}"
+
+    def local_path(self, area, path):
+        return None
+
+    def save_file(self, local_path, area, path, content_type=None):
+        extra = {'ContentType': content_type} if content_type else {}
+        self.client.upload_file(local_path, self.bucket, self._key(area, path),
+                                ExtraArgs=extra, Config=self.transfer_config)
+
+    def save_bytes(self, data, area, path, content_type=None):
+        extra = {'ContentType': content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self._key(area, path), Body=data, **extra)
+
+    def save_tree(self, local_dir, area, path):
+        import mimetypes
+
+        files = []
+        for dirpath, _, filenames in os.walk(local_dir):
+            for filename in filenames:
+                full = os.path.join(dirpath, filename)
+                relative = os.path.relpath(full, local_dir).replace(os.sep, '/')
+                files.append((full, f"{path.strip('/')}/{relative}"))
+        with ThreadPoolExecutor(max_workers=Config.STORAGE_S3_MAX_CONCURRENCY) as pool:
+            list(pool.map(lambda f: self.save_file(f[0], area, f[1], mimetypes.guess_type(f[0])[0]), files))
+
+    def _list_keys(self, prefix):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get('Contents', []):
+                yield item['Key']
+
+    def file_exists(self, area, path):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(area, path))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                raise
+            return False
+
+    def exists(self, area, path):
+        # Maybe a "directory"
+        return (self.file_exists(area, path)
+                or next(iter(self._list_keys(self._key(area, path) + '/')), None) is not None)
+
+    def copy(self, area, source_path, dest_path):
+        """Server-side copy; the bytes never pass through this node."""
+        source_key, dest_key = self._key(area, source_path), self._key(area, dest_path)
+        if source_key == dest_key:
+            return
+        keys = list(self._list_keys(source_key + '/')) or [source_key]
+        for key in keys:
+            target = dest_key + key[len(source_key):]
+            self.client.copy({'Bucket': self.bucket, 'Key': key}, self.bucket, target, Config=self.transfer_config)
+
+    def read_bytes(self, area, path):
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(area, path))
+        return response['Body'].read()
+
+    def presigned_url(self, area, path):
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': self._key(area, path)},
+            ExpiresIn=Config.STORAGE_S3_PRESIGN_SECONDS
+        )
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if Config.STORAGE_BACKEND == 's3':
+                    _storage = S3Storage(
+                        Config.STORAGE_S3_BUCKET,
+                        endpoint_url=Config.STORAGE_S3_ENDPOINT_URL,
+                        region=Config.STORAGE_S3_REGION
+                    )
+                else:
+                    _storage = LocalStorage({
+                        'media': MEDIA_ROOT,
+                        'certificates': os.path.join(os.getcwd(), 'certificates'),
+                        'avatars': os.path.join(os.getcwd(), 'avatars')
+                    })
+    return _storage
@@ -0,0 +1,212 @@
+# backend/core/upload_sessions.py
+"""
+Resumable, chunked uploads.
+
+A session is a `<id>.part` file plus a `<id>.json` sidecar with its metadata
+and how many bytes have arrived. Chunks must be sent in order (a client that
+lost track asks for `received` and continues from there); a chunk that
+overlaps what is already stored is trimmed, so retrying a chunk is harmless.
+Bytes are streamed to disk in small pieces and hashed as they arrive; the
+running hash lives in memory and is rebuilt from the .part file after a
+restart. Sessions that receive nothing for `ttl_seconds` are swept away
+when new sessions are created.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+_STREAM_PIECE = 1024 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, received=None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+
+def parse_content_range(header):
+    """'bytes 0-1048575/5000000' -> (0, 1048575, 5000000); total may be None for '*'."""
+    match = _RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError("Missing or malformed Content-Range header")
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    if end < start:
+        raise UploadError("Content-Range end is before start")
+    return start, end, None if total == '*' else int(total)
+
+
+class UploadSessionStore:
+    def __init__(self, root, ttl_seconds=24 * 3600):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(root, exist_ok=True)
+        self._locks = {}
+        self._hashers = {}  # upload_id -> (offset, sha256)
+        self._guard = threading.Lock()
+        self._last_sweep = 0
+
+    def _paths(self, upload_id):
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id or ''):
+            raise UploadError("Unknown upload session", status=404)
+        base = os.path.join(self.root, upload_id)
+        return f"{base}.json", f"{base}.part"
+
+    def _lock(self, upload_id):
+        with self._guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _save(self, session):
+        meta_path, _ = self._paths(session['upload_id'])
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, meta_path)
+
+    def sweep(self):
+        """Deletes abandoned sessions (no chunk for ttl_seconds). Returns how many."""
+        cutoff = time.time() - self.ttl_seconds
+        last_activity = {}
+        for name in os.listdir(self.root):
+            upload_id = name.split('.', 1)[0]
+            try:
+                mtime = os.path.getmtime(os.path.join(self.root, name))
+            except FileNotFoundError:
+                continue
+            last_activity[upload_id] = max(mtime, last_activity.get(upload_id, 0))
+
+        removed = 0
+        for upload_id, mtime in last_activity.items():
+            if mtime >= cutoff:
+                continue
+            with self._lock(upload_id):
+                for suffix in ('.json', '.json.tmp', '.part'):
+                    try:
+                        os.remove(os.path.join(self.root, upload_id + suffix))
+                    except FileNotFoundError:
+                        pass
+                self._hashers.pop(upload_id, None)
+            with self._guard:
+                self._locks.pop(upload_id, None)
+            removed += 1
+        if removed:
+            print(f"🧹 Removed {removed} abandoned upload sessions")
+        return removed
+
+    def create(self, total_size, metadata):
+        # At most one sweep per minute
+        if time.monotonic() - self._last_sweep > 60:
+            self._last_sweep = time.monotonic()
+            self.sweep()
+
+        if int(total_size) <= 0:
+            raise UploadError("Upload size must be greater than zero")
+        upload_id = uuid.uuid4().hex
+        session = {"upload_id": upload_id, "total_size": int(total_size), "received": 0, **metadata}
+        _, part_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        self._save(session)
+        return session
+
+    def get(self, upload_id):
+        meta_path, _ = self._paths(upload_id)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError("Unknown upload session", status=404)
+
+    def _hasher_at(self, upload_id, part_path, offset):
+        """sha256 over the first `offset` bytes, re-reading the file only if needed."""
+        cached = self._hashers.get(upload_id)
+        if cached and cached[0] == offset:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            remaining = offset
+            while remaining:
+                piece = f.read(min(_STREAM_PIECE, remaining))
+                if not piece:
+                    break
+                digest.update(piece)
+                remaining -= len(piece)
+        return digest
+
+    def write_chunk(self, upload_id, content_range, stream):
+        """Appends one chunk from `stream`. Returns the updated session."""
+        start, end, total = parse_content_range(content_range)
+        with self._lock(upload_id):
+            session = self.get(upload_id)
+            _, part_path = self._paths(upload_id)
+            received = session['received']
+
+            if total is not None and total != session['total_size']:
+                raise UploadError("Content-Range total does not match the session size")
+            if end >= session['total_size']:
+                raise UploadError("Chunk goes past the end of the file")
+            if start > received:
+                raise UploadError("Chunk is ahead of the received data", status=409, received=received)
+            if end < received:
+                return session  # Already stored (retried chunk)
+
+            # 1. Skip the part of the chunk we already have
+            skip = received - start
+            while skip:
+                piece = stream.read(min(_STREAM_PIECE, skip))
+                if not piece:
+                    break
+                skip -= len(piece)
+
+            # 2. Stream the rest to disk, hashing as it goes
+            digest = self._hasher_at(upload_id, part_path, received)
+            expected = end + 1 - received
+            with open(part_path, 'r+b') as out:
+                out.seek(received)
+                while expected:
+                    piece = stream.read(min(_STREAM_PIECE, expected))
+                    if not piece:
+                        break
+                    out.write(piece)
+                    digest.update(piece)
+                    received += len(piece)
+                    expected -= len(piece)
+                out.truncate(received)  # Drop anything a failed attempt left behind
+
+            self._hashers[upload_id] = (received, digest)
+            session['received'] = received
+            self._save(session)
+            if expected:
+                raise UploadError("Chunk body was shorter than its Content-Range", received=received)
+            return session
+
+    def finalize(self, upload_id, dest_path, on_complete):
+        """
+        Moves the completed upload to dest_path and calls
+        on_complete(session, content_hash). The session is deleted only if that
+        succeeds; if it raises, the file goes back into the session so the
+        client can retry finalize. Returns (session, content_hash, result).
+        """
+        with self._lock(upload_id):
+            session = self.get(upload_id)
+            meta_path, part_path = self._paths(upload_id)
+            if session['received'] != session['total_size']:
+                raise UploadError("Upload is incomplete", status=409, received=session['received'])
+
+            content_hash = self._hasher_at(upload_id, part_path, session['received']).hexdigest()
+            os.replace(part_path, dest_path)
+            try:
+                result = on_complete(session, content_hash)
+            except Exception:
+                os.replace(dest_path, part_path)
+                raise
+            os.remove(meta_path)
+            self._hashers.pop(upload_id, None)
+        with self._guard:
+            self._locks.pop(upload_id, None)
+        return session, content_hash, result
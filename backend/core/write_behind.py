@@ -0,0 +1,217 @@
+# backend/core/write_behind.py
+import atexit
+import threading
+import time
+from google.api_core.exceptions import NotFound
+from google.cloud import firestore
+
+# Firestore allows at most 500 writes per batch
+MAX_BATCH_WRITES = 450
+
+
+class WriteBehindBuffer:
+    """
+    Collects high-frequency updates in memory and writes them to Firestore in
+    batches, on a fixed interval and once more at interpreter shutdown.
+    Subclasses decide how pending entries are merged and turned into writes.
+    """
+
+    def __init__(self, name, db, users_ref, flush_interval):
+        self.name = name
+        self.db = db
+        self.users_ref = users_ref
+        self.flush_interval = flush_interval
+        self._pending = {}
+        # Drained but not yet committed, still visible to readers
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushed_writes = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, attempts=3):
+        """Final flush at shutdown, retried so pending updates are not dropped."""
+        self._stop.set()
+        for attempt in range(1, attempts + 1):
+            try:
+                self.flush()
+                return
+            except Exception as e:
+                print(f"❌ {self.name} final flush attempt {attempt} failed: {e}")
+                time.sleep(attempt)
+        print(f"❌ {self.name} dropped {len(self._pending)} pending updates at shutdown")
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ {self.name} flush failed: {e}")
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._in_flight = pending
+        return pending
+
+    def _restore(self, pending):
+        """Puts entries back after a failed flush, merging with newer ones."""
+        with self._lock:
+            self._in_flight = {}
+            for key, entry in pending.items():
+                newer = self._pending.get(key)
+                self._pending[key] = self._merge(entry, newer) if newer else entry
+
+    def flush(self):
+        pending = self._drain()
+        if not pending:
+            return 0
+
+        writes = self._build_writes(pending)
+        failed = set()
+        for i in range(0, len(writes), MAX_BATCH_WRITES):
+            chunk = writes[i:i + MAX_BATCH_WRITES]
+            batch = self.db.batch()
+            for uid, fields in chunk:
+                batch.update(self.users_ref.document(uid), fields)
+            try:
+                batch.commit()
+            except Exception as e:
+                # One bad document (e.g. a deleted user) must not hold back the rest
+                print(f"⚠️ {self.name} batch failed ({e}), retrying its writes one by one")
+                failed.update(self._commit_each(chunk))
+
+        self.flushed_writes += len(writes) - len(failed)
+        if failed:
+            self._restore({k: v for k, v in pending.items() if self._uid(k) in failed})
+            raise RuntimeError(f"{self.name} flush failed for {len(failed)} users")
+
+        with self._lock:
+            self._in_flight = {}
+        return len(writes)
+
+    def _commit_each(self, writes):
+        """Returns the uids whose write failed and should be retried later."""
+        failed = []
+        for uid, fields in writes:
+            try:
+                self.users_ref.document(uid).update(fields)
+            except NotFound:
+                print(f"⚠️ {self.name} dropped updates for missing user {uid}")
+            except Exception as e:
+                print(f"❌ {self.name} write for {uid} failed: {e}")
+                failed.append(uid)
+        return failed
+
+    def _uid(self, key):
+        return key
+
+    def _merge(self, older, newer):
+        raise NotImplementedError
+
+    def _build_writes(self, pending):
+        """Returns a list of (uid, update_fields)."""
+        raise NotImplementedError
+
+
+class HeartbeatBuffer(WriteBehindBuffer):
+    """
+    Keeps only the latest player position per (user, course) and turns the
+    forward progress between heartbeats into watch time.
+    """
+
+    def __init__(self, db, users_ref, flush_interval, max_delta_seconds):
+        super().__init__("heartbeat", db, users_ref, flush_interval)
+        self.max_delta_seconds = max_delta_seconds
+        self._last_seen = {}
+
+    def record(self, uid, course_id, module_id, timestamp):
+        key = (uid, course_id)
+        now = time.monotonic()
+        with self._lock:
+            watched = 0.0
+            last = self._last_seen.get(key)
+            if last and last[0] == module_id:
+                delta = timestamp - last[1]
+                # Seeks and long pauses are not watch time (allow up to 2x playback speed)
+                if 0 < delta <= min(self.max_delta_seconds, (now - last[2]) * 2 + 1):
+                    watched = delta
+            self._last_seen[key] = (module_id, timestamp, now)
+
+            entry = {"module_id": module_id, "timestamp": timestamp, "watched_seconds": watched}
+            older = self._pending.get(key)
+            self._pending[key] = self._merge(older, entry) if older else entry
+
+    def peek(self, uid, course_id):
+        """Latest unflushed position, so resume reads see their own writes."""
+        with self._lock:
+            key = (uid, course_id)
+            entry = self._pending.get(key) or self._in_flight.get(key)
+            return dict(entry) if entry else None
+
+    def _uid(self, key):
+        return key[0]
+
+    def _merge(self, older, newer):
+        merged = dict(newer)
+        merged['watched_seconds'] = older['watched_seconds'] + newer['watched_seconds']
+        return merged
+
+    def flush(self):
+        # Forget players that went quiet so _last_seen stays small
+        cutoff = time.monotonic() - self.max_delta_seconds * 4
+        with self._lock:
+            for key in [k for k, v in self._last_seen.items() if v[2] < cutoff]:
+                del self._last_seen[key]
+        return super().flush()
+
+    def _build_writes(self, pending):
+        # One update per user, covering every course they touched
+        per_user, watched = {}, {}
+        for (uid, course_id), entry in pending.items():
+            fields = per_user.setdefault(uid, {})
+            key = f"student_learning_progress.{course_id}"
+            fields[f"{key}.last_accessed_module_id"] = entry['module_id']
+            fields[f"{key}.last_timestamp_seconds"] = entry['timestamp']
+            fields[f"{key}.last_updated_at"] = firestore.SERVER_TIMESTAMP
+            watched[uid] = watched.get(uid, 0.0) + entry['watched_seconds']
+
+        for uid, fields in per_user.items():
+            if watched[uid] > 0:
+                fields["student_stats.stat_total_watch_time_hours"] = firestore.Increment(watched[uid] / 3600.0)
+        return list(per_user.items())
+
+
+class XPAggregator(WriteBehindBuffer):
+    """
+    Sums XP increments per user so a burst of correct answers becomes a single
+    Increment write per flush interval.
+    """
+
+    def __init__(self, db, users_ref, flush_interval):
+        super().__init__("xp", db, users_ref, flush_interval)
+
+    def record(self, uid, amount):
+        with self._lock:
+            self._pending[uid] = self._pending.get(uid, 0) + amount
+
+    def pending_for(self, uid):
+        """Unflushed XP (including a flush in progress) for read-your-writes."""
+        with self._lock:
+            return self._pending.get(uid, 0) + self._in_flight.get(uid, 0)
+
+    def _merge(self, older, newer):
+        return older + newer
+
+    def _build_writes(self, pending):
+        return [
+            (uid, {"student_stats.stat_total_xp": firestore.Increment(amount)})
+            for uid, amount in pending.items() if amount
+        ]
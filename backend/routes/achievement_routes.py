@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify, g
-from core.db_manager import DatabaseManager
+from werkzeug.local import LocalProxy
+from core.db_manager import get_db_manager
 from core.security import require_token
 
 achievement_bp = Blueprint('achievement', __name__)
-db = DatabaseManager()
+db = LocalProxy(get_db_manager)
 
 @achievement_bp.route('/badges', methods=['GET'])
 @require_token
@@ -1,20 +1,19 @@
 # backend/routes/auth_routes.py
-import os
 import uuid
 import requests
 from werkzeug.utils import secure_filename # <--- Added missing import
 from flask import Blueprint, request, jsonify, g
 from firebase_admin import auth
-from core.db_manager import DatabaseManager
+from werkzeug.local import LocalProxy
+from core.db_manager import get_db_manager
 from core.security import require_token
+from core.firebase_setup import get_auth
 from core.config import Config
+from core.storage import get_storage
 from schemas.models import StudentModel, InstructorModel
 
-# Assuming these exist in your project based on your code usage
-# from core.utils import upload_file_to_cloud, TEMP_DIR 
-
 auth_bp = Blueprint('auth', __name__)
-db = DatabaseManager()
+db = LocalProxy(get_db_manager)
 
 # --- 1. REGISTRATION ---
 @auth_bp.route('/register', methods=['POST'])
@@ -31,7 +30,7 @@ def register_user():
 
         # Create User in Firebase
         try:
-            user_record = auth.create_user(
+            user_record = get_auth().create_user(
                 email=email,
                 password=password,
                 display_name=full_name
@@ -147,20 +146,15 @@ def upload_avatar():
             return jsonify({"status": "error", "message": "No file selected"}), 400
 
         filename = secure_filename(file.filename)
-        unique_name = f"avatar_{g.user_uid}_{uuid.uuid4().hex[:6]}_{filename}"
-        local_path = os.path.join(TEMP_DIR, unique_name)
-        file.save(local_path)
+        # Unique per upload, so the file can be cached forever
+        unique_name = f"avatar_{uuid.uuid4().hex[:12]}_{filename}"
         
-        # Upload to Firebase
-        storage_path = f"users/{g.user_uid}/avatar_{filename}"
-        public_url = upload_file_to_cloud(local_path, storage_path, file.content_type)
+        # Save to Storage (avatars are small, no temp file needed)
+        get_storage().save_bytes(file.read(), 'avatars', f"{g.user_uid}/{unique_name}", file.content_type)
+        public_url = f"{Config.PUBLIC_BASE_URL}/avatars/{g.user_uid}/{unique_name}"
         
         # Update DB
         db.update_student_avatar(g.user_uid, public_url)
-        
-        # Clean up
-        if os.path.exists(local_path):
-            os.remove(local_path)
 
         return jsonify({"status": "success", "avatar_url": public_url}), 200
 
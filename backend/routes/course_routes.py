@@ -1,52 +1,57 @@
 from flask import Blueprint, request, jsonify, g
-from core.db_manager import DatabaseManager
-from core.security import require_token
-from firebase_admin import auth # Ensure this is imported
+from werkzeug.local import LocalProxy
+from core.db_manager import get_db_manager
+from core.security import require_token, get_optional_uid
 
 course_bp = Blueprint('course', __name__)
-db = DatabaseManager()
+db = LocalProxy(get_db_manager)
 
 @course_bp.route('', methods=['GET'])
 def get_all_courses():
     search_query = request.args.get('search')
     level = request.args.get('level')
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
     
     # 1. OPTIONAL: Check for token manually to inject progress
     # We don't use @require_token because we want guests to see courses too
-    uid = None
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith("Bearer "):
-        try:
-            token = auth_header.split("Bearer ")[1]
-            decoded = auth.verify_id_token(token)
-            uid = decoded['uid']
-        except:
-            pass # Invalid token, treat as guest
+    uid = get_optional_uid()
 
     try:
         # Pass UID to db manager
-        courses = db.get_courses_filtered(search_query, level, uid)
+        courses, next_cursor = db.get_courses_filtered(search_query, level, uid, limit=limit, cursor=cursor)
         return jsonify({
             "status": "success", 
             "count": len(courses),
-            "data": courses
+            "data": courses,
+            "next_cursor": next_cursor
         }), 200
 
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@course_bp.route('/enrolled', methods=['GET'])
+@require_token
+def get_my_courses():
+    """
+    Courses the current user is enrolled in, with progress
+    """
+    try:
+        courses = db.get_enrolled_courses(g.user_uid)
+        return jsonify({
+            "status": "success",
+            "count": len(courses),
+            "data": courses
+        }), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @course_bp.route('/<course_id>', methods=['GET'])
 def get_course_details(course_id):
     # 1. Check for Token manually (Hybrid Route: Public Info + Private Content)
-    uid = None
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith("Bearer "):
-        try:
-            token = auth_header.split("Bearer ")[1]
-            decoded = auth.verify_id_token(token)
-            uid = decoded['uid']
-        except:
-            pass 
+    uid = get_optional_uid()
 
     try:
         course_data = db.get_course_full(course_id)
@@ -60,6 +65,8 @@ def get_course_details(course_id):
 
         # 3. Filter Sensitive Data if not enrolled
         if not is_enrolled:
+            # Course docs are cached and shared, so work on a copy
+            course_data = dict(course_data)
             # Hide modules media and AI data
             sanitized_modules = []
             for mod in course_data.get('course_modules', []):
@@ -1,22 +1,40 @@
 # backend/routes/instructor_routes.py
 import os
-import threading
 import uuid
 from werkzeug.utils import secure_filename
 from flask import Blueprint, request, jsonify, g
-from core.db_manager import DatabaseManager
+from werkzeug.local import LocalProxy
+from core.db_manager import get_db_manager
 from core.security import require_token
-from services.ai_engine import AIEngine
+from core.config import Config
+from core.local_file_handler import save_stream_hashed
+from core.upload_sessions import UploadSessionStore, UploadError
+from services.processing_jobs import enqueue_module_processing
 from schemas.models import ModuleModel
 from datetime import datetime # <--- Ensure this is imported at the top
 
 instructor_bp = Blueprint('instructor', __name__)
-db = DatabaseManager()
-ai_engine = AIEngine()
+db = LocalProxy(get_db_manager)
 
 # Ensure temp directory exists
 TEMP_DIR = os.path.join(os.getcwd(), 'temp_uploads')
 os.makedirs(TEMP_DIR, exist_ok=True)
+upload_sessions = UploadSessionStore(os.path.join(TEMP_DIR, 'sessions'), Config.UPLOAD_SESSION_TTL_SECONDS)
+
+def _create_module_and_enqueue(course_id, title, m_type, local_path, filename, mime_type, content_hash):
+    """Creates the module (status: processing) and queues its processing job."""
+    new_module = ModuleModel.create_new(title, seq_num=1, resource_type=m_type)
+    new_module['module_status'] = 'processing'
+    db.add_module_to_course(course_id, new_module)
+    module_id = new_module['module_id']
+    db.update_module_status(course_id, module_id, "Queued for processing...", 5)
+
+    # Durable: a bounded worker pool picks it up, retries it and resumes it after a restart.
+    # Last step, so nothing can fail once a worker may already be reading local_path.
+    job_id = enqueue_module_processing(
+        course_id, module_id, local_path, filename, mime_type, content_hash=content_hash
+    )
+    return module_id, job_id
 
 @instructor_bp.route('/module/upload', methods=['POST'])
 # @require_token
@@ -50,32 +68,109 @@ def upload_media_trigger_ai():
         local_path = os.path.join(TEMP_DIR, unique_filename)
         
         print(f"💾 Saving temp file to: {local_path}")
-        file.save(local_path)
+        # Hashed while writing: identical re-uploads reuse earlier results
+        content_hash = save_stream_hashed(file.stream, local_path)
         
-        # 4. Create DB Entry (Status: Processing)
-        new_module = ModuleModel.create_new(title, seq_num=1, resource_type=m_type)
-        new_module['module_status'] = 'processing'
-        db.add_module_to_course(course_id, new_module)
-        module_id = new_module['module_id']
-
-        # 5. Start Background Thread
-        # We pass the local path so the thread can upload it to Firebase + Gemini
-        thread = threading.Thread(
-        target=ai_engine.process_content_background, 
+        # 4. Create DB Entry (Status: Processing) & Queue Processing Job
         # Pass the original secure filename to be used in the final path
-        args=(course_id, module_id, local_path, secure_filename(file.filename), file.content_type)
+        module_id, job_id = _create_module_and_enqueue(
+            course_id, title, m_type, local_path, filename, file.content_type, content_hash
         )
-        thread.start()
 
         return jsonify({
             "status": "processing_started", 
             "module_id": module_id,
+            "job_id": job_id,
             "message": "File received. Processing in background."
         }), 200
 
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# --- RESUMABLE UPLOADS ---
+# 1. POST /module/uploads            {course_id, title, type, filename, mime_type, size}
+# 2. PUT  /module/uploads/<id>       raw bytes + "Content-Range: bytes start-end/size"
+#    GET  /module/uploads/<id>       how many bytes arrived (resume from there)
+# 3. POST /module/uploads/<id>/finalize  -> same processing as /module/upload
+
+def _upload_error(e):
+    body = {"status": "error", "message": str(e)}
+    if e.received is not None:
+        body['received'] = e.received
+    return jsonify(body), e.status
+
+@instructor_bp.route('/module/uploads', methods=['POST'])
+# @require_token
+def create_upload_session():
+    data = request.get_json(silent=True) or {}
+    course_id, title, filename = data.get('course_id'), data.get('title'), data.get('filename')
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        size = -1
+    if not course_id or not title or not filename or size <= 0:
+        return jsonify({"status": "error", "message": "Missing course_id, title, filename or size"}), 400
+
+    session = upload_sessions.create(size, {
+        "course_id": course_id,
+        "title": title,
+        "type": data.get('type', 'video'),
+        "filename": secure_filename(filename),
+        "mime_type": data.get('mime_type', 'application/octet-stream')
+    })
+    return jsonify({
+        "upload_id": session['upload_id'],
+        "received": 0,
+        "total_size": size,
+        "chunk_size": Config.UPLOAD_CHUNK_SIZE
+    }), 201
+
+@instructor_bp.route('/module/uploads/<upload_id>', methods=['GET'])
+# @require_token
+def get_upload_session(upload_id):
+    try:
+        session = upload_sessions.get(upload_id)
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({"upload_id": upload_id, "received": session['received'], "total_size": session['total_size']}), 200
+
+@instructor_bp.route('/module/uploads/<upload_id>', methods=['PUT'])
+# @require_token
+def upload_chunk(upload_id):
+    if request.content_length and request.content_length > Config.UPLOAD_MAX_CHUNK_BYTES:
+        return jsonify({"status": "error", "message": "Chunk too large"}), 413
+    try:
+        # request.stream: read straight from the socket, never buffered whole
+        session = upload_sessions.write_chunk(upload_id, request.headers.get('Content-Range'), request.stream)
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({"upload_id": upload_id, "received": session['received'], "total_size": session['total_size']}), 200
+
+@instructor_bp.route('/module/uploads/<upload_id>/finalize', methods=['POST'])
+# @require_token
+def finalize_upload(upload_id):
+    def create_and_enqueue(session, content_hash):
+        return _create_module_and_enqueue(
+            session['course_id'], session['title'], session['type'], local_path,
+            session['filename'], session['mime_type'], content_hash
+        )
+
+    try:
+        local_path = os.path.join(TEMP_DIR, f"{upload_id}_{upload_sessions.get(upload_id)['filename']}")
+        # The session (and its bytes) survive a failure here, so finalize can be retried
+        _, _, (module_id, job_id) = upload_sessions.finalize(upload_id, local_path, create_and_enqueue)
+    except UploadError as e:
+        return _upload_error(e)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({
+        "status": "processing_started",
+        "module_id": module_id,
+        "job_id": job_id,
+        "message": "File received. Processing in background."
+    }), 200
+
 # Add this endpoint for Frontend to poll status (fallback if not using Firestore Listeners)
 @instructor_bp.route('/module/<module_id>/status', methods=['GET'])
 @require_token
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify, g
-from core.db_manager import DatabaseManager
+from werkzeug.local import LocalProxy
+from core.db_manager import get_db_manager
 from core.security import require_token
 
 learn_bp = Blueprint('learn', __name__)
-db = DatabaseManager()
+db = LocalProxy(get_db_manager)
 
 # --- Scope 3: Learning & AI Progress ---
 
@@ -23,9 +24,9 @@ def get_module_content(course_id, module_id):
         # 3. Get User Progress (Pass course_id now!)
         user_progress = db.get_user_module_progress(g.user_uid, course_id, module_id)
 
-        # 4. Sanitize
+        # 4. Sanitize (interaction points live with the module's AI materials)
         sanitized_interactions = []
-        for point in module_data.get('module_ai_interaction_points', []):
+        for point in db.get_module_interactions(course_id, module_id):
             sanitized_interactions.append({
                 "interaction_id": point['interaction_id'],
                 "timestamp": point['interaction_timestamp_seconds'],
@@ -35,6 +36,8 @@ def get_module_content(course_id, module_id):
 
         return jsonify({
             "video_url": module_data.get('module_media_url'),
+            # Master playlist for HLS-capable players (Safari, hls.js); video_url always plays
+            "hls_url": module_data.get('module_media_hls_url') or None,
             "interaction_points": sanitized_interactions,
             "watched_history": user_progress.get('last_timestamp', 0)
         }), 200
@@ -50,7 +53,7 @@ def validate_answer():
     7. Validate Answer (The "Judge")
     Method: POST
     Endpoint: /api/learn/validate
-    Payload: module_id, interaction_id, selected_option
+    Payload: module_id, interaction_id, selected_option, course_id (optional)
     """
     try:
         data = request.json
@@ -59,9 +62,10 @@ def validate_answer():
         user_answer = data.get('selected_option')
 
         # 1. Fetch Correct Answer from DB (Private field)
-        correct_answer, feedback = db.get_correct_answer(module_id, interaction_id)
+        # course_id is optional, the module index resolves it from module_id
+        correct_answer, feedback = db.get_correct_answer(module_id, interaction_id, data.get('course_id'))
         
-        is_correct = (user_answer == correct_answer)
+        is_correct = correct_answer is not None and user_answer == correct_answer
         
         # 2. Update Stats
         updated_xp = 0
@@ -86,11 +90,19 @@ def update_heartbeat():
     8. Update Heartbeat
     Method: POST
     Endpoint: /api/learn/heartbeat
-    Payload: { "module_id": "...", "current_timestamp": 45 }
+    Payload: { "course_id": "...", "module_id": "...", "current_timestamp": 45 }
     """
     try:
         data = request.json
-        # db.update_watch_time(g.user_uid, data.get('module_id'), data.get('current_timestamp'))
+        course_id = data.get('course_id')
+        module_id = data.get('module_id')
+        timestamp = data.get('current_timestamp')
+
+        if not course_id or not module_id or not isinstance(timestamp, (int, float)):
+            return jsonify({"status": "error", "message": "Missing fields"}), 400
+
+        # Buffered in memory and flushed in batches, no Firestore write here
+        db.update_learning_heartbeat(g.user_uid, course_id, module_id, timestamp)
         return jsonify({"status": "success"}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
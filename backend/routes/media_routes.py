@@ -1,18 +1,20 @@
 # backend/routes/media_routes.py
-import os
-from flask import Blueprint, send_from_directory
-from core.local_file_handler import MEDIA_ROOT
+from flask import Blueprint, jsonify
+from core.media_serving import serve_stored
+from core.local_file_handler import media_relative_path
 
 media_bp = Blueprint('media', __name__)
 
-@media_bp.route('/<course_id>/<module_id>/<filename>')
+@media_bp.route('/<course_id>/<module_id>/<path:filename>')
 def serve_media_file(course_id, module_id, filename):
     """
-    Serves a specific media file from the local storage.
+    Serves a specific media file from storage (any API node can serve any module).
     Example URL: /media/course_123/mod_abc/video.mp4
+                 /media/course_123/mod_abc/hls/master.m3u8
+    Supports Range requests and conditional GETs, presigned-URL redirects,
+    or hands the bytes to the front proxy (see core/media_serving.py).
     """
-    # Construct the directory path from the URL parameters
-    directory_path = os.path.join(MEDIA_ROOT, course_id, module_id)
-    
-    # Securely send the file from the constructed path
-    return send_from_directory(directory_path, filename)
\ No newline at end of file
+    response = serve_stored('media', media_relative_path(course_id, module_id, filename))
+    if response is None:
+        return jsonify({"error": "Media not found"}), 404
+    return response
@@ -1,3 +1,6 @@
+import base64
+import json
+import re
 import uuid
 from datetime import datetime
 
@@ -33,12 +36,15 @@ class StudentModel:
                 "stat_total_quizzes_completed": 0
             },
             
+            # Keyed by course_id, this is what enrollment checks use
+            "student_enrollments": {},
             "student_enrolled_courses": [], 
-            # Structure for enrolled course items:
+            # Structure for enrolled course items (same in both):
             # {
             #    "course_id": "...",
             #    "progress_percent": 0,
-            #    "is_completed": False
+            #    "is_completed": False,
+            #    "enrolled_at": "..."
             # }
 
             "student_learning_progress": {}
@@ -56,7 +62,61 @@ class CourseModel:
             "course_instructor_id": instructor_id,
             "course_created_at": get_utc_now(),
             "course_is_published": False,
-            "course_modules": [] 
+            # Modules are stored in modules/{module_id}, in this order
+            "course_module_ids": [],
+            "course_module_count": 0
+        }
+
+def tokenize_search_text(text):
+    """Lower-cased word tokens used for catalog search."""
+    return [t for t in re.split(r"[^a-z0-9+#]+", (text or "").lower()) if t]
+
+class CatalogModel:
+    # Fields returned to the catalog page (search terms are never sent)
+    PREVIEW_FIELDS = [
+        "course_id", "course_title", "course_description", "course_price_inr",
+        "course_instructor_id", "course_thumbnail_url", "course_level", "course_module_count"
+    ]
+    MAX_SEARCH_TERMS = 200
+
+    @staticmethod
+    def encode_cursor(sort_key):
+        raw = json.dumps({"k": sort_key}).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Raises ValueError for anything that is not a cursor we issued."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["k"]
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def from_course(course):
+        """Compact projection of a course, stored at course_catalog/{course_id}."""
+        title_tokens = tokenize_search_text(course.get("course_title"))
+        terms = list(title_tokens)
+        # Title word prefixes so "pyth" finds "Python"
+        for token in title_tokens:
+            terms.extend(token[:n] for n in range(3, len(token)))
+        terms.extend(tokenize_search_text(course.get("course_description")))
+
+        return {
+            "course_id": course.get("course_id"),
+            "course_title": course.get("course_title"),
+            "course_description": course.get("course_description"),
+            "course_price_inr": course.get("course_price_inr"),
+            "course_instructor_id": course.get("course_instructor_id"),
+            "course_thumbnail_url": course.get("course_thumbnail_url", ""),
+            "course_level": course.get("course_level", "Beginner"),
+            "course_module_count": course.get("course_module_count", 0),
+            "course_is_published": course.get("course_is_published", False),
+            "course_created_at": course.get("course_created_at"),
+            # Unique and stable; the catalog is ordered by it (newest first)
+            "course_sort_key": f"{course.get('course_created_at') or ''}|{course.get('course_id')}",
+            "course_search_terms": list(dict.fromkeys(terms))[:CatalogModel.MAX_SEARCH_TERMS]
         }
 
 class ModuleModel:
@@ -68,6 +128,7 @@ class ModuleModel:
             "module_sequence_number": seq_num,
             "module_resource_type": resource_type,
             "module_media_url": "",
+            "module_media_hls_url": "", # HLS master playlist; module_media_url stays the mp4
             "module_status": "draft",
             "module_ai_interaction_points": [],
             
@@ -0,0 +1,76 @@
+"""
+One-shot migration of student_enrolled_courses arrays to the keyed
+student_enrollments map. Duplicate entries (left by re-enrolling) are
+collapsed to the earliest enrollment, and the array is rewritten
+de-duplicated for clients that still read it. Safe to re-run.
+
+Usage: python scripts/migrate_enrollments.py [--dry-run]
+"""
+import sys
+import os
+
+# Add the parent directory (backend) to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+# Firestore allows at most 500 writes per batch
+BATCH_LIMIT = 450
+
+if not firebase_admin._apps:
+    cred = credentials.Certificate("../serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+
+db = firestore.client()
+
+def build_enrollments(items, existing):
+    enrollments = dict(existing or {})
+    normalized = []
+    for item in items:
+        if isinstance(item, str): # Legacy check
+            item = {"course_id": item, "progress_percent": 0, "is_completed": False, "enrolled_at": None}
+        if item.get('course_id'):
+            normalized.append(item)
+
+    # Earliest enrollment wins (undated legacy entries last), keep the best progress
+    normalized.sort(key=lambda item: (item.get('enrolled_at') is None, item.get('enrolled_at') or ''))
+    for item in normalized:
+        current = enrollments.setdefault(item['course_id'], dict(item))
+        current['is_completed'] = bool(current.get('is_completed') or item.get('is_completed'))
+        current['progress_percent'] = max(current.get('progress_percent', 0), item.get('progress_percent', 0))
+    return enrollments
+
+def migrate(dry_run=False):
+    batch = db.batch()
+    pending, migrated, removed = 0, 0, 0
+    docs = db.collection('users').select(['student_enrolled_courses', 'student_enrollments']).stream()
+    for doc in docs:
+        data = doc.to_dict()
+        items = data.get('student_enrolled_courses')
+        if items is None:
+            continue # Instructors
+
+        enrollments = build_enrollments(items, data.get('student_enrollments'))
+        deduped = list(enrollments.values())
+        removed += len(items) - len(deduped)
+        batch.update(doc.reference, {
+            "student_enrollments": enrollments,
+            "student_enrolled_courses": deduped
+        })
+        pending += 1
+        migrated += 1
+        if pending >= BATCH_LIMIT:
+            if not dry_run:
+                batch.commit()
+            batch = db.batch()
+            pending = 0
+
+    if pending and not dry_run:
+        batch.commit()
+    print(f"🎉 Migrated {migrated} users, removed {removed} duplicate enrollments{' (dry run)' if dry_run else ''}.")
+
+if __name__ == "__main__":
+    migrate(dry_run='--dry-run' in sys.argv)
@@ -0,0 +1,78 @@
+"""
+One-shot migration from embedded course_modules arrays to the per-module layout:
+    courses/{course_id}           -> course_module_ids + course_module_count
+    modules/{module_id}           -> light module fields
+    module_materials/{module_id}  -> interaction points + AI materials
+Safe to re-run: courses without a course_modules array are skipped.
+
+Usage: python scripts/migrate_module_layout.py [--dry-run]
+"""
+import sys
+import os
+
+# Add the parent directory (backend) to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from core.db_manager import split_module_fields
+
+# Firestore allows at most 500 writes per batch
+BATCH_LIMIT = 450
+
+if not firebase_admin._apps:
+    cred = credentials.Certificate("../serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+
+db = firestore.client()
+
+def migrate(dry_run=False):
+    migrated, skipped = 0, 0
+    for course_doc in db.collection('courses').stream():
+        data = course_doc.to_dict()
+        modules = data.get('course_modules')
+        if modules is None:
+            skipped += 1
+            continue
+
+        course_id = course_doc.id
+        module_ids = []
+        batch = db.batch()
+        pending = 0
+        for mod in modules:
+            module_id = mod['module_id']
+            if module_id in module_ids:
+                continue  # Drop duplicates left by ArrayUnion on differing dicts
+            module_ids.append(module_id)
+
+            light, heavy = split_module_fields(mod)
+            light['module_course_id'] = course_id
+            heavy['module_course_id'] = course_id
+            batch.set(db.collection('modules').document(module_id), light)
+            batch.set(db.collection('module_materials').document(module_id), heavy)
+            pending += 2
+            if pending >= BATCH_LIMIT:
+                if not dry_run:
+                    batch.commit()
+                batch = db.batch()
+                pending = 0
+
+        # The course doc is only rewritten once every module doc exists
+        if not dry_run:
+            if pending:
+                batch.commit()
+            course_doc.reference.update({
+                "course_module_ids": module_ids,
+                "course_module_count": len(module_ids),
+                "course_modules": firestore.DELETE_FIELD
+            })
+
+        migrated += 1
+        print(f"✅ {course_id}: {len(module_ids)} modules{' (dry run)' if dry_run else ''}")
+
+    print(f"\n🎉 Migrated {migrated} courses, skipped {skipped} already migrated.")
+
+if __name__ == "__main__":
+    migrate(dry_run='--dry-run' in sys.argv)
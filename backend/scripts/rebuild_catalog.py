@@ -0,0 +1,51 @@
+"""
+Rebuilds course_catalog/{course_id} projections from the course documents.
+Run once after deploying the catalog projection, or whenever courses were
+edited directly in the Firebase console.
+
+Usage: python scripts/rebuild_catalog.py
+"""
+import sys
+import os
+
+# Add the parent directory (backend) to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from schemas.models import CatalogModel
+
+# Firestore allows at most 500 writes per batch
+BATCH_LIMIT = 450
+
+if not firebase_admin._apps:
+    cred = credentials.Certificate("../serviceAccountKey.json")
+    firebase_admin.initialize_app(cred)
+
+db = firestore.client()
+
+def rebuild():
+    catalog_ref = db.collection('course_catalog')
+    batch = db.batch()
+    pending, total = 0, 0
+    # Only the fields the projection needs, never the module lists
+    fields = [
+        "course_id", "course_title", "course_description", "course_price_inr", "course_instructor_id",
+        "course_thumbnail_url", "course_level", "course_module_count", "course_is_published", "course_created_at"
+    ]
+    for doc in db.collection('courses').select(fields).stream():
+        batch.set(catalog_ref.document(doc.id), CatalogModel.from_course(doc.to_dict()))
+        pending += 1
+        total += 1
+        if pending >= BATCH_LIMIT:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    print(f"🎉 Rebuilt {total} catalog entries.")
+
+if __name__ == "__main__":
+    rebuild()
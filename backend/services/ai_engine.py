@@ -1,22 +1,35 @@
 import os
 import json
 import time
-import PyPDF2
-from gtts import gTTS
-from moviepy.editor import AudioFileClip, ImageClip, CompositeVideoClip
-from weasyprint import HTML
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+import threading
 from core.config import Config
-from core.db_manager import DatabaseManager
-from core.local_file_handler import save_file_locally
-from google import genai
-from google.genai import types
+from werkzeug.local import LocalProxy
+from core.db_manager import get_db_manager
+from core.local_file_handler import media_relative_path, public_media_url
+from core.storage import get_storage
+from services.hls import MASTER_PLAYLIST
+from services.pipeline import StageGraph
 
-# Use the new SDK's client
-client = genai.Client(api_key=Config.GEMINI_API_KEY)
-db = DatabaseManager()
+# The media/AI stack (moviepy, selenium, weasyprint, PyPDF2, gTTS, genai) is
+# imported inside the methods that use it, so API workers that never process
+# content don't pay for it. See core/startup_report.py.
+
+db = LocalProxy(get_db_manager)
+storage = LocalProxy(get_storage)
+_client = None
+_client_lock = threading.Lock()
+
+def get_genai_client():
+    """Gemini client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(api_key=Config.GEMINI_API_KEY)
+    return _client
+
+client = LocalProxy(get_genai_client)
 
 class AIEngine:
     def __init__(self):
@@ -41,69 +54,156 @@ class AIEngine:
             return {}
 
     # --- MASTER CONTROLLER ---
-    def process_content_background(self, course_id, module_id, local_file_path, original_filename, mime_type):
+    def process_content(self, course_id, module_id, local_file_path, original_filename, mime_type, content_hash=None):
+        """
+        Runs the whole pipeline for one upload (called by the processing job queue).
+        Raises on failure so the job can be retried; the uploaded source file is
+        left in place for the caller to clean up. With a content_hash, bytes
+        that were processed before reuse the earlier results.
+        """
         temp_files_to_delete = []
         try:
             print(local_file_path, original_filename, mime_type)
-            # --- PATH A: User Uploaded a Video ---
             if "video" in mime_type:
-                db.update_module_status(course_id, module_id, "Saving Video Locally...", 10)
-                relative_url_path = save_file_locally(local_file_path, course_id, module_id, original_filename)
-                
-                # Using 127.0.0.1 for local testing, update to your specific IP if needed
-                full_url = f"http://127.0.0.1:5000{relative_url_path}"
+                pipeline = 'video'
+            elif "pdf" in mime_type or "text" in mime_type or "application" in mime_type:
+                pipeline = 'document'
+            else:
+                return
+
+            if content_hash and self._reuse_artifacts(content_hash, pipeline, course_id, module_id, original_filename):
+                return
+
+            # --- PATH A: User Uploaded a Video ---
+            if pipeline == 'video':
+                db.update_module_status(course_id, module_id, "Saving Video...", 10)
+                # The upload itself stays in place for packaging and analysis
+                storage.save_file(
+                    local_file_path, 'media', media_relative_path(course_id, module_id, original_filename), mime_type
+                )
+                full_url = public_media_url(course_id, module_id, original_filename)
                 db.update_module_video_url(course_id, module_id, full_url)
                 
-                final_local_path = os.path.join(os.getcwd(), 'media_storage', course_id, module_id, original_filename)
-                self._analyze_video_logic(course_id, module_id, final_local_path)
+                # Packaging and AI analysis both only need the video
+                results = (StageGraph(max_workers=2)
+                           .add('package', lambda r: self._package_hls(course_id, module_id, local_file_path, full_url))
+                           .add('analyze', lambda r: self._analyze_video_logic(course_id, module_id, local_file_path))
+                           .run())
+                interaction_points, ai_materials = results['analyze']
+                hls_dir = results['package']
+                files = {"video": media_relative_path(course_id, module_id, original_filename)}
 
             # --- PATH B: User Uploaded a Document ---
-            elif "pdf" in mime_type or "text" in mime_type or "application" in mime_type:
+            else:
                 db.update_module_status(course_id, module_id, "Analyzing Document Content...", 15)
-                html_content, script_text = self._generate_html_and_script_from_doc(local_file_path)
-                
-                # 1. PDF Generation
-                pdf_path = self._create_pdf_from_html(html_content, module_id)
-                temp_files_to_delete.append(pdf_path)
-                save_file_locally(pdf_path, course_id, module_id, f"{module_id}_notes.pdf")
-
-                # 2. Video Generation
-                video_path = self._create_scrolling_video(html_content, script_text, course_id, module_id)
-                temp_files_to_delete.append(video_path)
-                
-                relative_v_path = save_file_locally(video_path, course_id, module_id, f"{module_id}_lecture.mp4")
-                full_video_url = f"http://127.0.0.1:5000{relative_v_path}"
-                db.update_module_video_url(course_id, module_id, full_video_url)
-                
-                final_video_path = os.path.join(os.getcwd(), 'media_storage', course_id, module_id, f"{module_id}_lecture.mp4")
-                self._analyze_video_logic(course_id, module_id, final_video_path)
+                interaction_points, ai_materials, hls_dir = self._run_document_pipeline(
+                    course_id, module_id, local_file_path, temp_files_to_delete
+                )
+                files = {
+                    "video": media_relative_path(course_id, module_id, f"{module_id}_lecture.mp4"),
+                    "notes_pdf": media_relative_path(course_id, module_id, f"{module_id}_notes.pdf")
+                }
+
+            if hls_dir:
+                files['hls'] = hls_dir
+
+            if content_hash:
+                db.record_content_artifacts(content_hash, {
+                    "pipeline": pipeline,
+                    "files": files,
+                    "module_ai_interaction_points": interaction_points,
+                    "module_ai_materials": ai_materials,
+                    "source_course_id": course_id,
+                    "source_module_id": module_id
+                })
 
         except Exception as e:
             print(f"❌ Processing Error: {e}")
             db.update_module_status(course_id, module_id, f"Error: {str(e)}", 0)
+            raise
         finally:
-            if os.path.exists(local_file_path):
-                os.remove(local_file_path)
             for f in temp_files_to_delete:
                 if f and os.path.exists(f):
                     os.remove(f)
 
+    def _reuse_artifacts(self, content_hash, pipeline, course_id, module_id, original_filename):
+        """
+        Points the module at the media and AI data produced earlier for the
+        same source bytes (storage-side copies, no re-render, no Gemini call).
+        Returns False when there is nothing usable to reuse.
+        """
+        artifacts = db.get_content_artifacts(content_hash)
+        if not artifacts or artifacts.get('pipeline') != pipeline:
+            return False
+        files = artifacts.get('files', {})
+        if not all(storage.exists('media', path) for path in files.values()):
+            return False  # Media was removed since, process from scratch
+
+        db.update_module_status(course_id, module_id, "Reusing Previous Results...", 50)
+        filenames = {
+            "video": original_filename if pipeline == 'video' else f"{module_id}_lecture.mp4",
+            "notes_pdf": f"{module_id}_notes.pdf",
+            "hls": "hls"
+        }
+        for kind, path in files.items():
+            storage.copy('media', path, media_relative_path(course_id, module_id, filenames[kind]))
+        video_url = public_media_url(course_id, module_id, filenames['video'])
+        hls_url = public_media_url(course_id, module_id, f"hls/{MASTER_PLAYLIST}") if 'hls' in files else None
+        db.update_module_video_url(course_id, module_id, video_url, hls_url=hls_url)
+
+        db.update_module_ai_data(
+            course_id, module_id,
+            artifacts.get('module_ai_interaction_points', []), artifacts.get('module_ai_materials')
+        )
+        db.update_module_status(course_id, module_id, "Completed", 100)
+        print(f"♻️ Reused results of module {artifacts.get('source_module_id')} for {module_id}")
+        return True
+
+    def _package_hls(self, course_id, module_id, video_path, video_url):
+        """
+        Adds an HLS ladder next to the mp4 and records its master playlist as
+        module_media_hls_url; module_media_url stays the mp4, which every
+        browser plays. Best effort: if packaging fails the module just has no
+        ladder. Returns the ladder directory (in the 'media' storage area) or None.
+        """
+        if not Config.HLS_ENABLED:
+            return None
+        import shutil
+        from services.hls import package_hls
+
+        hls_dir = media_relative_path(course_id, module_id, 'hls')
+        local_dir = f"temp_{module_id}_hls"
+        try:
+            package_hls(video_path, local_dir)
+            storage.save_tree(local_dir, 'media', hls_dir)
+        except Exception as e:
+            print(f"⚠️ HLS packaging failed, serving mp4 only: {e}")
+            return None
+        finally:
+            shutil.rmtree(local_dir, ignore_errors=True)
+
+        hls_url = public_media_url(course_id, module_id, f"hls/{MASTER_PLAYLIST}")
+        db.update_module_video_url(course_id, module_id, video_url, hls_url=hls_url)
+        return hls_dir
+
     # --- DOCUMENT PROCESSING SUB-ROUTINES ---
-    def _generate_html_and_script_from_doc(self, doc_path):
-        text = ""
-        if doc_path.endswith('.pdf'):
-            with open(doc_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages: text += page.extract_text() + " "
-        else:
-            with open(doc_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
+    def _generate_html_and_script_from_doc(self, doc_path, module_id):
+        from google.genai import types
+        from services.doc_extract import extract_document_text, extraction_summary
+
+        # Stops reading once the prompt budget is filled
+        text, stats = extract_document_text(doc_path)
+        try:
+            # Budget use and slow pages, next to the module's status in processing_logs
+            db.record_processing_stats(module_id, 'extraction', extraction_summary(stats))
+        except Exception as e:
+            print(f"⚠️ Could not record extraction stats: {e}")
 
         prompt = f"""
         Analyze this document text. Generate a JSON dictionary with two keys:
         1. "html_content": A styled Tailwind CSS HTML document explaining the topics.
         2. "spoken_script": A clear, educational voiceover script.
-        TEXT: {text[:7000]}
+        TEXT: {text}
         """
         response = client.models.generate_content(
             model=self.model_id, 
@@ -114,65 +214,137 @@ class AIEngine:
         return data.get('html_content', '<h1>No Content</h1>'), data.get('spoken_script', 'No script generated.')
 
     def _create_pdf_from_html(self, html_content, module_id):
+        from weasyprint import HTML
+
         pdf_path = f"temp_{module_id}_notes.pdf"
         HTML(string=html_content).write_pdf(pdf_path)
         return pdf_path
 
-    def _create_scrolling_video(self, html_content, script_text, course_id, module_id):
-        db.update_module_status(course_id, module_id, "Generating Audio...", 40)
-        tts = gTTS(text=script_text, lang='en')
+    def _synthesize_audio(self, script_text, module_id):
+        from services.tts import synthesize_script
+
         audio_path = f"temp_{module_id}.mp3"
-        tts.save(audio_path)
-        audio_clip = AudioFileClip(audio_path)
-        duration = audio_clip.duration
+        # Sentence-level cache: unchanged sentences are not synthesized again
+        synthesize_script(script_text, audio_path, lang=Config.TTS_LANG, voice=Config.TTS_VOICE)
+        return audio_path
+
+    def _screenshot_lecture(self, html_content, module_id):
+        from services.browser_pool import screenshot_html
 
-        db.update_module_status(course_id, module_id, "Rendering Video Frames...", 50)
         html_path = f"temp_{module_id}.html"
         image_path = f"temp_{module_id}.png"
         with open(html_path, "w", encoding="utf-8") as f: f.write(html_content)
-        
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--window-size=1280,3000') # Tall window for scrolling content
-        
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-        driver.get(f"file:///{os.path.abspath(html_path)}")
-        time.sleep(2)
-        driver.save_screenshot(image_path)
-        driver.quit()
-
-        db.update_module_status(course_id, module_id, "Animating Lecture...", 60)
-        image_clip = ImageClip(image_path).set_duration(duration)
-        img_width, img_height = image_clip.size
-        
-        def scroll(get_frame, t):
-            # Slow scroll from top to bottom based on audio duration
-            y_pos = -int((img_height - 720) * (t / duration))
-            return get_frame(t)[y_pos : y_pos + 720, :]
-
-        scrolling_clip = image_clip.fl(scroll, apply_to=['mask'])
-        final_clip = CompositeVideoClip([scrolling_clip.set_position(('center', 'top'))], size=(1280, 720))
-        final_clip = final_clip.set_audio(audio_clip)
-        
-        video_path = f"temp_{module_id}_lecture.mp4"
-        final_clip.write_videofile(video_path, fps=24, codec="libx264")
+        try:
+            # Warm browser from the pool, captured once the page is actually ready
+            screenshot_html(html_path, image_path)
+        finally:
+            os.remove(html_path)
+        return image_path
 
-        # Cleanup artifacts
-        for p in [html_path, image_path, audio_path]:
-            if os.path.exists(p): os.remove(p)
-            
+    def _create_scrolling_video(self, image_path, audio_path, module_id):
+        from services.video_renderer import render_scrolling_video
+
+        # Slow scroll from top to bottom over the audio, done inside ffmpeg
+        video_path = f"temp_{module_id}_lecture.mp4"
+        render_scrolling_video(image_path, audio_path, video_path)
         return video_path
-    
+
+    def _run_document_pipeline(self, course_id, module_id, doc_path, temp_files):
+        """
+        LLM -> (notes PDF | narration | screenshot) -> encode -> (HLS | analysis).
+        Stages that share only their inputs run in parallel.
+        Returns (interaction_points, ai_materials, hls_dir).
+        """
+        def track(path):
+            temp_files.append(path)
+            return path
+
+        def llm(r):
+            return self._generate_html_and_script_from_doc(doc_path, module_id)
+
+        def pdf(r):
+            pdf_path = track(self._create_pdf_from_html(r['llm'][0], module_id))
+            notes_path = media_relative_path(course_id, module_id, f"{module_id}_notes.pdf")
+            storage.save_file(pdf_path, 'media', notes_path, 'application/pdf')
+            return notes_path
+
+        def tts(r):
+            return track(self._synthesize_audio(r['llm'][1], module_id))
+
+        def screenshot(r):
+            return track(self._screenshot_lecture(r['llm'][0], module_id))
+
+        def encode(r):
+            # The local render is kept (until the pipeline ends) for packaging and analysis
+            video_path = track(self._create_scrolling_video(r['screenshot'], r['tts'], module_id))
+            filename = f"{module_id}_lecture.mp4"
+            storage.save_file(video_path, 'media', media_relative_path(course_id, module_id, filename), 'video/mp4')
+            full_video_url = public_media_url(course_id, module_id, filename)
+            db.update_module_video_url(course_id, module_id, full_video_url)
+            return video_path, full_video_url
+
+        def package(r):
+            return self._package_hls(course_id, module_id, *r['encode'])
+
+        def analyze(r):
+            # Reports its own progress (upload, wait, quizzes, completed)
+            return self._analyze_video_logic(course_id, module_id, r['encode'][0])
+
+        graph = (StageGraph(max_workers=Config.PIPELINE_MAX_PARALLEL_STAGES)
+                 .add('llm', llm, status="Lecture Script Ready...", progress=30)
+                 .add('pdf', pdf, deps=['llm'], status="Notes PDF Ready...", progress=40)
+                 .add('tts', tts, deps=['llm'], status="Narration Ready...", progress=45)
+                 .add('screenshot', screenshot, deps=['llm'], status="Slides Rendered...", progress=50)
+                 .add('encode', encode, deps=['tts', 'screenshot'], status="Lecture Video Ready...", progress=65)
+                 .add('package', package, deps=['encode'])
+                 .add('analyze', analyze, deps=['encode']))
+
+        reported = {"progress": 15}
+
+        def on_stage_done(stage, seconds):
+            # Parallel stages finish in any order; never move the bar backwards
+            if stage.status and stage.progress > reported["progress"]:
+                reported["progress"] = stage.progress
+                db.update_module_status(course_id, module_id, stage.status, stage.progress)
+
+        results = graph.run(on_stage_done)
+        return (*results['analyze'], results['package'])
+
     # --- VIDEO ANALYSIS SUB-ROUTINE ---
+    def _make_analysis_proxy(self, course_id, module_id, video_path):
+        """
+        Low-res, low-fps copy with the original audio, for the Gemini upload.
+        Returns the path to upload: the proxy, or the source if no proxy helps.
+        """
+        if not Config.ANALYSIS_PROXY_ENABLED:
+            return video_path
+        from services.analysis_proxy import make_analysis_proxy
+
+        db.update_module_status(course_id, module_id, "Preparing Video for AI...", 68)
+        proxy_path = f"temp_{module_id}_analysis.mp4"
+        try:
+            report = make_analysis_proxy(video_path, proxy_path)
+        except Exception as e:
+            print(f"⚠️ Analysis proxy failed, uploading the original: {e}")
+            return video_path
+
+        mb = 1024 * 1024
+        print(f"📉 Analysis proxy {report['rung']}: {report['source_bytes'] / mb:.1f} MB -> "
+              f"{report['proxy_bytes'] / mb:.1f} MB ({report['saved_bytes'] / mb:.1f} MB saved)")
+        return proxy_path if report['saved_bytes'] else video_path
+
     def _analyze_video_logic(self, course_id, module_id, video_path):
+        from google.genai import types
+
         gemini_file = None
+        upload_path = video_path
         try:
-            # 1. Upload Phase
+            # 1. Upload Phase (a small proxy: the analysis needs speech and coarse visuals only)
+            upload_path = self._make_analysis_proxy(course_id, module_id, video_path)
             db.update_module_status(course_id, module_id, "Uploading Video to AI...", 70)
-            print(f"Starting upload for: {video_path}")
+            print(f"Starting upload for: {upload_path}")
             
-            gemini_file = client.files.upload(file=video_path)
+            gemini_file = client.files.upload(file=upload_path)
             print(f"Upload complete. Gemini File Name: {gemini_file.name}")
             
             # 2. Processing Wait Phase (The "Stuck" Fix)
@@ -228,11 +400,15 @@ class AIEngine:
             db.update_module_ai_data(course_id, module_id, interaction_points, ai_materials)
             db.update_module_status(course_id, module_id, "Completed", 100)
             print("AI Analysis Completed Successfully.")
+            return interaction_points, ai_materials
             
         except Exception as e:
             print(f"❌ Video Analysis Error: {e}")
             db.update_module_status(course_id, module_id, f"AI Error: {str(e)}", 0)
+            raise
         finally:
+            if upload_path != video_path and os.path.exists(upload_path):
+                os.remove(upload_path)
             # Clean up the file from Google's servers to save storage/privacy
             if gemini_file:
                 print(f"Deleting remote file: {gemini_file.name}")
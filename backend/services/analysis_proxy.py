@@ -0,0 +1,80 @@
+# backend/services/analysis_proxy.py
+"""
+Small copy of a lecture for the Gemini Files API.
+
+The analysis only needs the speech and coarse visuals, so the video track is
+re-encoded at low resolution, frame rate and bitrate while the audio stream
+is copied untouched. The rung is the best one of ANALYSIS_PROXY_LADDER whose
+estimated size fits ANALYSIS_PROXY_TARGET_MB for this video's duration.
+"""
+import os
+import subprocess
+from core.config import Config
+from services.video_renderer import get_ffmpeg_binary, probe_duration
+
+_AUDIO_KBPS_ESTIMATE = 128
+
+
+def parse_ladder(spec):
+    """'480:2:300,360:1:150' -> [(480, 2, 300), (360, 1, 150)] (height, fps, video kbps), best first."""
+    rungs = []
+    for item in spec.split(','):
+        if item.strip():
+            height, fps, kbps = item.split(':')
+            rungs.append((int(height), float(fps), int(kbps)))
+    return sorted(rungs, reverse=True)
+
+
+def choose_rung(duration, ladder=None, target_mb=None):
+    ladder = parse_ladder(ladder or Config.ANALYSIS_PROXY_LADDER)
+    target_bytes = (target_mb or Config.ANALYSIS_PROXY_TARGET_MB) * 1024 * 1024
+    for rung in ladder:
+        estimated = (rung[2] + _AUDIO_KBPS_ESTIMATE) * 1000 / 8 * duration
+        if estimated <= target_bytes:
+            return rung
+    return ladder[-1]
+
+
+def _encode(source_path, output_path, rung, audio_args):
+    height, fps, kbps = rung
+    cmd = [
+        get_ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-y",
+        "-i", source_path,
+        "-map", "0:v:0", "-map", "0:a?",
+        # Never upscale small sources
+        "-vf", f"scale=-2:'min({height},ih)',fps={fps}",
+        "-c:v", "libx264", "-preset", "veryfast", "-b:v", f"{kbps}k", "-maxrate", f"{kbps}k",
+        "-bufsize", f"{kbps * 2}k",
+        *audio_args,
+        "-movflags", "+faststart", output_path,
+    ]
+    return subprocess.run(cmd, capture_output=True, text=True)
+
+
+def make_analysis_proxy(source_path, output_path):
+    """
+    Writes the proxy to output_path. Returns {"source_bytes", "proxy_bytes",
+    "saved_bytes", "rung"}; if the proxy is not smaller it is deleted and
+    saved_bytes is 0 (callers should then upload the source).
+    """
+    rung = choose_rung(probe_duration(source_path))
+
+    # Keep the speech exactly as recorded; re-encode only if the codec can't go into mp4
+    result = _encode(source_path, output_path, rung, ["-c:a", "copy"])
+    if result.returncode != 0:
+        result = _encode(source_path, output_path, rung, ["-c:a", "aac", "-b:a", "128k"])
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg (analysis proxy) failed: {result.stderr.strip()[-1000:]}")
+
+    source_bytes = os.path.getsize(source_path)
+    proxy_bytes = os.path.getsize(output_path)
+    if proxy_bytes >= source_bytes:
+        os.remove(output_path)
+        proxy_bytes = source_bytes
+
+    return {
+        "source_bytes": source_bytes,
+        "proxy_bytes": proxy_bytes,
+        "saved_bytes": source_bytes - proxy_bytes,
+        "rung": f"{rung[0]}p@{rung[1]:g}fps/{rung[2]}k"
+    }
@@ -0,0 +1,169 @@
+# backend/services/browser_pool.py
+"""
+Warm pool of headless Chrome instances for lecture screenshots.
+
+Starting Chrome (and resolving chromedriver) costs seconds, so drivers are kept
+alive between renders, health-checked before reuse and recycled after
+BROWSER_MAX_RENDERS renders to keep memory leaks in check. Pages are captured
+as soon as they are actually ready (document loaded, fonts and images done, no
+new network requests for a short window) instead of after a fixed sleep.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from core.config import Config
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+_READY_STATE_JS = """
+return {
+    ready: document.readyState === 'complete',
+    fonts: !document.fonts || document.fonts.status === 'loaded',
+    images: Array.from(document.images).every(img => img.complete),
+    resources: performance.getEntriesByType('resource').length
+};
+"""
+
+
+def _resolve_driver_path():
+    """Resolves chromedriver once per process instead of once per render."""
+    global _driver_path
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                if Config.CHROMEDRIVER_PATH:
+                    _driver_path = Config.CHROMEDRIVER_PATH
+                else:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+
+def wait_for_page_ready(driver, timeout=None, idle_seconds=0.5):
+    """
+    Blocks until the page is loaded and the network has been quiet for
+    idle_seconds. Returns the time waited; gives up (without raising) at timeout.
+    """
+    timeout = timeout or Config.BROWSER_READY_TIMEOUT_SECONDS
+    started = time.monotonic()
+    last_count, quiet_since = -1, None
+    while time.monotonic() - started < timeout:
+        state = driver.execute_script(_READY_STATE_JS)
+        now = time.monotonic()
+        if state['resources'] != last_count:
+            last_count, quiet_since = state['resources'], now
+        if state['ready'] and state['fonts'] and state['images'] and now - quiet_since >= idle_seconds:
+            break
+        time.sleep(0.05)
+    else:
+        print(f"⚠️ Page not idle after {timeout}s, capturing anyway.")
+    return time.monotonic() - started
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.renders = 0
+
+
+class BrowserPool:
+    def __init__(self, size, max_renders, window_size="1280,3000"):
+        self.size = size
+        self.max_renders = max_renders
+        self.window_size = window_size
+        self._idle = queue.LifoQueue()  # Most recently used first: warm caches
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _launch(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument(f'--window-size={self.window_size}') # Tall window for scrolling content
+        driver = webdriver.Chrome(service=ChromeService(_resolve_driver_path()), options=options)
+        return _PooledDriver(driver)
+
+    @staticmethod
+    def _healthy(pooled):
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def _take(self):
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return self._launch()
+            if self._healthy(pooled):
+                return pooled
+            self._quit(pooled)
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """Borrows a driver; at most `size` are in use (and alive) at once."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser available in the pool")
+        pooled = None
+        try:
+            pooled = self._take()
+            yield pooled.driver
+            pooled.renders += 1
+        except Exception:
+            # A failed render may have left the browser in a bad state
+            if pooled:
+                self._quit(pooled)
+                pooled = None
+            raise
+        finally:
+            if pooled:
+                if self._closed or pooled.renders >= self.max_renders:
+                    self._quit(pooled)
+                else:
+                    self._idle.put(pooled)
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def get_browser_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool(Config.BROWSER_POOL_SIZE, Config.BROWSER_MAX_RENDERS)
+                atexit.register(_pool.close)
+    return _pool
+
+
+def screenshot_html(html_path, image_path):
+    with get_browser_pool().acquire() as driver:
+        driver.get(f"file:///{os.path.abspath(html_path)}")
+        waited = wait_for_page_ready(driver)
+        driver.save_screenshot(image_path)
+    print(f"📸 Screenshot ready after {waited:.2f}s")
+    return image_path
@@ -0,0 +1,126 @@
+# backend/services/doc_extract.py
+"""
+Budget-aware text extraction for uploaded documents.
+
+Only the first DOC_PROMPT_BUDGET_CHARS characters go into the LLM prompt, so
+pages are read in order and extraction stops once the budget is filled,
+instead of parsing a whole textbook for its first pages. The first few pages
+are read in this process; if the budget is still not met and many pages
+remain (scans, slide decks with little text per page), the rest is read in
+ordered waves on a process pool. Every page read is timed.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core.config import Config
+
+
+def _read_page(reader, number):
+    started = time.perf_counter()
+    text = reader.pages[number].extract_text() or ""
+    return number, text, time.perf_counter() - started
+
+
+def _extract_range(doc_path, start, stop):
+    """[(page_number, text, seconds)] for pages start..stop-1; runs in a pool process."""
+    import PyPDF2
+
+    with open(doc_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [_read_page(reader, number) for number in range(start, stop)]
+
+
+class _Collector:
+    def __init__(self, budget):
+        self.budget = budget
+        self.parts = []
+        self.chars = 0
+        self.page_seconds = []
+
+    def add(self, results):
+        for number, text, seconds in results:
+            if self.full:
+                return
+            self.parts.append(text)
+            self.chars += len(text) + 1
+            self.page_seconds.append((number, seconds))
+
+    @property
+    def full(self):
+        return self.chars >= self.budget
+
+    def text(self):
+        return " ".join(self.parts)[:self.budget]
+
+
+def extract_document_text(doc_path, budget=None):
+    """Returns (text, stats); text holds at most `budget` characters."""
+    budget = budget or Config.DOC_PROMPT_BUDGET_CHARS
+    started = time.perf_counter()
+
+    if not doc_path.endswith('.pdf'):
+        with open(doc_path, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read(budget)
+        return text, {"pages_total": None, "pages_read": None, "chars": len(text), "budget": budget,
+                      "seconds": time.perf_counter() - started, "parallel": False, "page_seconds": []}
+
+    import PyPDF2
+
+    collected = _Collector(budget)
+    # One reader (one parse of the xref table) for everything read in this process
+    with open(doc_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        total = len(reader.pages)
+
+        # 1. The first pages in-process: usually enough for the budget
+        head = min(total, Config.DOC_EXTRACT_SEQUENTIAL_PAGES)
+        for number in range(head):
+            collected.add([_read_page(reader, number)])
+            if collected.full:
+                break
+
+        # 2. Still short but few pages left: finish with the same reader
+        parallel = not collected.full and total - head >= Config.DOC_EXTRACT_PARALLEL_MIN_PAGES
+        if not parallel:
+            for number in range(head, total):
+                if collected.full:
+                    break
+                collected.add([_read_page(reader, number)])
+
+    # 3. Still short and a long way to go: ordered waves of page ranges on a process pool
+    if parallel:
+        workers = Config.DOC_EXTRACT_WORKERS
+        per_task = Config.DOC_EXTRACT_PAGES_PER_TASK
+        # spawn, not fork: this runs inside threaded workers with gRPC channels
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            for wave_start in range(head, total, workers * per_task):
+                starts = range(wave_start, min(total, wave_start + workers * per_task), per_task)
+                stops = [min(total, start + per_task) for start in starts]
+                for results in pool.map(_extract_range, [doc_path] * len(starts), starts, stops):
+                    collected.add(results)
+                if collected.full:
+                    break
+
+    stats = {
+        "pages_total": total,
+        "pages_read": len(collected.page_seconds),
+        "chars": min(collected.chars, budget),
+        "budget": budget,
+        "seconds": time.perf_counter() - started,
+        "parallel": parallel,
+        "page_seconds": collected.page_seconds
+    }
+    slowest = max(collected.page_seconds, key=lambda p: p[1], default=(None, 0))
+    print(f"📄 Read {stats['pages_read']}/{total} pages ({stats['chars']} chars) in {stats['seconds']:.2f}s"
+          f"{' on a process pool' if parallel else ''}; slowest page {slowest[0]}: {slowest[1]:.2f}s")
+    return collected.text(), stats
+
+
+def extraction_summary(stats, slowest=5):
+    """Firestore-friendly copy of the stats (no nested lists) with only the slowest pages."""
+    summary = {k: v for k, v in stats.items() if k != 'page_seconds'}
+    summary['seconds'] = round(summary['seconds'], 3)
+    summary['budget_filled'] = stats['chars'] >= stats['budget']
+    pages = sorted(stats['page_seconds'], key=lambda p: p[1], reverse=True)[:slowest]
+    summary['slowest_pages'] = [{"page": number, "seconds": round(seconds, 3)} for number, seconds in pages]
+    return summary
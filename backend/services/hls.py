@@ -0,0 +1,95 @@
+# backend/services/hls.py
+"""
+Adaptive-bitrate packaging: a lecture mp4 becomes several H.264 renditions
+as segmented HLS, plus a master playlist players pick a rendition from.
+
+    <module media dir>/hls/master.m3u8
+    <module media dir>/hls/720p.m3u8, 720p_0000.ts, ...
+
+Renditions are encoded in parallel (one ffmpeg each, CPU threads split
+between them). Rungs taller than the source are skipped.
+"""
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from core.config import Config
+from services.video_renderer import get_ffmpeg_binary, probe_video_size
+
+MASTER_PLAYLIST = 'master.m3u8'
+
+
+def parse_ladder(spec):
+    """'720:2800,480:1400' -> [(720, 2800), (480, 1400)] (height, video kbps), tallest first."""
+    rungs = []
+    for item in spec.split(','):
+        if item.strip():
+            height, kbps = item.split(':')
+            rungs.append((int(height), int(kbps)))
+    return sorted(rungs, reverse=True)
+
+
+def _even(value):
+    return max(2, int(round(value / 2)) * 2)
+
+
+def _encode_rendition(source_path, output_dir, height, kbps, threads):
+    name = f"{height}p"
+    seg = Config.HLS_SEGMENT_SECONDS
+    cmd = [
+        get_ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-y",
+        "-i", source_path,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", f"scale=-2:{height}",
+        "-c:v", "libx264", "-preset", Config.HLS_X264_PRESET, "-threads", str(threads),
+        "-b:v", f"{kbps}k", "-maxrate", f"{int(kbps * 1.07)}k", "-bufsize", f"{int(kbps * 1.5)}k",
+        # Keyframe at every segment boundary so all renditions switch cleanly
+        "-force_key_frames", f"expr:gte(t,n_forced*{seg})", "-sc_threshold", "0",
+        "-c:a", "aac", "-b:a", "128k", "-ac", "2",
+        "-f", "hls", "-hls_time", str(seg), "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(output_dir, f"{name}_%04d.ts"),
+        os.path.join(output_dir, f"{name}.m3u8"),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg ({name}) failed: {result.stderr.strip()[-1000:]}")
+    return name
+
+
+def package_hls(source_path, output_dir, ladder=None):
+    """
+    Writes the renditions and master playlist into output_dir (replaced if it
+    exists). Returns the master playlist path.
+    """
+    ladder = parse_ladder(ladder or Config.HLS_LADDER)
+    src_width, src_height = probe_video_size(source_path)
+    rungs = [(h, kbps) for h, kbps in ladder if h <= src_height] or [(src_height, ladder[-1][1])]
+
+    # Build next to the final directory and swap it in, so players never see a half-written ladder
+    tmp_dir = f"{output_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    workers = min(len(rungs), Config.HLS_MAX_PARALLEL_RENDITIONS)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            names = list(pool.map(lambda rung: _encode_rendition(source_path, tmp_dir, rung[0], rung[1], threads), rungs))
+
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+        for name, (height, kbps) in zip(names, rungs):
+            width = _even(src_width * height / src_height)
+            bandwidth = (kbps + 128) * 1000
+            lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height}")
+            lines.append(f"{name}.m3u8")
+        with open(os.path.join(tmp_dir, MASTER_PLAYLIST), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(tmp_dir, output_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    print(f"📺 Packaged HLS: {', '.join(names)}")
+    return os.path.join(output_dir, MASTER_PLAYLIST)
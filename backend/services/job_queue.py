@@ -0,0 +1,264 @@
+# backend/services/job_queue.py
+"""
+Durable job queue on a local SQLite file.
+
+Jobs survive restarts: a job is `queued` until a worker claims it, which sets
+a lease (owner + expiry) and bumps `attempts`. Workers renew the lease while
+the handler runs. A job whose lease ran out (crashed or killed worker) is
+claimable again, and recover_interrupted() re-queues jobs left `running` by a
+dead process on this host straight away. Failures are retried with
+exponential backoff until max_attempts, after which the job is `failed`.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. the input is gone)."""
+    retryable = False
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_run_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, next_run_at);
+"""
+
+
+class JobQueue:
+    def __init__(self, db_path, lease_seconds=300, max_attempts=3, backoff_seconds=30):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row_to_job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    def enqueue(self, kind, payload, max_attempts=None):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, state, max_attempts, next_run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, max_attempts or self.max_attempts, now, now, now)
+            )
+        return job_id
+
+    def claim(self, owner, kinds=None):
+        """Atomically takes the next runnable job (or an expired lease) for `owner`."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            query = (
+                "SELECT * FROM jobs WHERE ((state = ? AND next_run_at <= ?) "
+                "OR (state = ? AND lease_expires_at < ?))"
+            )
+            params = [QUEUED, now, RUNNING, now]
+            if kinds:
+                query += f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            row = conn.execute(query + " ORDER BY next_run_at LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, owner, now + self.lease_seconds, now, row['id'])
+            )
+            conn.execute("COMMIT")
+            return self.get(row['id'])
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew_lease(self, job_id, owner):
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND state = ?",
+                (time.time() + self.lease_seconds, time.time(), job_id, owner, RUNNING)
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id, owner):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ?",
+                (DONE, time.time(), job_id, owner)
+            )
+
+    def fail(self, job_id, owner, error, retry=True):
+        """Schedules a retry with exponential backoff. Returns True if the job gave up."""
+        job = self.get(job_id)
+        if job is None or job['lease_owner'] != owner:
+            return False
+
+        now = time.time()
+        gave_up = not retry or job['attempts'] >= job['max_attempts']
+        if gave_up:
+            state, next_run_at = FAILED, now
+        else:
+            state, next_run_at = QUEUED, now + self.backoff_seconds * (2 ** (job['attempts'] - 1))
+
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, next_run_at = ?, last_error = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, updated_at = ? WHERE id = ?",
+                (state, next_run_at, str(error)[:2000], now, job_id)
+            )
+        return gave_up
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            return self._row_to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def recover_interrupted(self):
+        """
+        Re-queues jobs left `running` by a process on this host that no longer
+        exists, instead of waiting for their leases to expire.
+        """
+        prefix = f"{socket.gethostname()}:"
+        recovered = 0
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, lease_owner FROM jobs WHERE state = ? AND lease_owner LIKE ?",
+                (RUNNING, prefix + '%')
+            ).fetchall()
+            for row in rows:
+                pid = int(row['lease_owner'].split(':')[1])
+                # Our own pid here means a previous incarnation (e.g. PID 1 in a container)
+                if pid != os.getpid() and _pid_alive(pid):
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET state = ?, next_run_at = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                    "updated_at = ? WHERE id = ? AND lease_owner = ?",
+                    (QUEUED, time.time(), time.time(), row['id'], row['lease_owner'])
+                )
+                recovered += 1
+        return recovered
+
+    def counts(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+            return {row['state']: row['n'] for row in rows}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WorkerPool:
+    """
+    A fixed number of worker threads pulling jobs from a JobQueue.
+    handlers: {kind: fn(payload)}; give_up_handlers: {kind: fn(payload, error)}
+    is called once a job has exhausted its retries.
+    """
+
+    def __init__(self, queue, handlers, size=2, poll_interval=2.0, give_up_handlers=None):
+        self.queue = queue
+        self.handlers = handlers
+        self.give_up_handlers = give_up_handlers or {}
+        self.size = size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        recovered = self.queue.recover_interrupted()
+        if recovered:
+            print(f"♻️ Re-queued {recovered} interrupted processing jobs.")
+        for i in range(self.size):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _owner(self):
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def _run(self):
+        owner = self._owner()
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(owner, kinds=list(self.handlers))
+            except Exception as e:
+                print(f"❌ Job queue claim failed: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.run_job(job, owner)
+
+    def run_job(self, job, owner):
+        # Keep the lease alive while a long render is running
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(self.queue.lease_seconds / 3):
+                self.queue.renew_lease(job['id'], owner)
+
+        renewer = threading.Thread(target=renew, daemon=True)
+        renewer.start()
+        try:
+            self.handlers[job['kind']](job['payload'])
+            self.queue.complete(job['id'], owner)
+        except Exception as e:
+            retry = getattr(e, 'retryable', True)
+            print(f"❌ Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+            if self.queue.fail(job['id'], owner, e, retry=retry):
+                handler = self.give_up_handlers.get(job['kind'])
+                if handler:
+                    handler(job['payload'], e)
+        finally:
+            done.set()
@@ -0,0 +1,72 @@
+# backend/services/pipeline.py
+"""
+A small stage graph for the processing pipeline.
+
+Each stage declares the stages it depends on and is run (on a thread pool) as
+soon as all of them have finished, so independent work such as PDF rendering,
+TTS and the screenshot overlaps and a document takes as long as its critical
+path. The first failing stage stops the graph and its exception is re-raised.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    def __init__(self, name, fn, deps=(), status=None, progress=None):
+        self.name = name
+        self.fn = fn            # fn(results) -> result; results holds finished stages by name
+        self.deps = tuple(deps)
+        self.status = status    # Reported once the stage finishes
+        self.progress = progress
+
+
+class StageGraph:
+    def __init__(self, max_workers=3):
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add(self, name, fn, deps=(), status=None, progress=None):
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = Stage(name, fn, deps, status, progress)
+        return self
+
+    def run(self, on_stage_done=None):
+        """
+        Runs every stage and returns {name: result}. on_stage_done(stage, seconds)
+        is called from the calling thread after each stage, in completion order.
+        """
+        results = {}
+        waiting = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+            while waiting or running:
+                # 1. Start everything whose dependencies are done
+                for name, stage in list(waiting.items()):
+                    if all(dep in results for dep in stage.deps):
+                        del waiting[name]
+                        running[pool.submit(self._timed, stage, dict(results))] = stage
+
+                # 2. Collect whatever finishes next
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        result, seconds = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    results[stage.name] = result
+                    print(f"⏱️ Stage '{stage.name}' took {seconds:.1f}s")
+                    if on_stage_done:
+                        on_stage_done(stage, seconds)
+        return results
+
+    @staticmethod
+    def _timed(stage, results):
+        started = time.monotonic()
+        result = stage.fn(results)
+        return result, time.monotonic() - started
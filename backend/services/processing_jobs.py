@@ -0,0 +1,106 @@
+# backend/services/processing_jobs.py
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from werkzeug.local import LocalProxy
+from core.config import Config
+from core.db_manager import get_db_manager
+from services.job_queue import JobQueue, WorkerPool, PermanentJobError
+
+PROCESS_MODULE = 'process_module'
+
+db = LocalProxy(get_db_manager)
+_queue = None
+_queue_lock = threading.Lock()
+
+
+class ModuleLeaseHeld(Exception):
+    """Another worker (possibly on another node) is processing this module. Retried later."""
+
+
+def get_job_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(
+                    Config.JOB_QUEUE_PATH,
+                    lease_seconds=Config.JOB_LEASE_SECONDS,
+                    max_attempts=Config.JOB_MAX_ATTEMPTS,
+                    backoff_seconds=Config.JOB_RETRY_BACKOFF_SECONDS
+                )
+    return _queue
+
+
+def enqueue_module_processing(course_id, module_id, local_path, original_filename, mime_type, content_hash=None):
+    return get_job_queue().enqueue(PROCESS_MODULE, {
+        "course_id": course_id,
+        "module_id": module_id,
+        "local_path": local_path,
+        "original_filename": original_filename,
+        "mime_type": mime_type,
+        "content_hash": content_hash
+    })
+
+
+@contextmanager
+def module_lease(module_id):
+    """Holds the Firestore processing lock for a module, renewing it while the job runs."""
+    owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    ttl = Config.JOB_LEASE_SECONDS
+    if not db.acquire_module_lease(module_id, owner, ttl):
+        raise ModuleLeaseHeld(f"Module {module_id} is being processed elsewhere")
+
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(ttl / 3):
+            db.acquire_module_lease(module_id, owner, ttl)
+
+    threading.Thread(target=renew, daemon=True).start()
+    try:
+        yield
+    finally:
+        stop.set()
+        db.release_module_lease(module_id, owner)
+
+
+def handle_process_module(payload):
+    from services.ai_engine import AIEngine
+
+    with module_lease(payload['module_id']):
+        try:
+            AIEngine().process_content(
+                payload['course_id'], payload['module_id'], payload['local_path'],
+                payload['original_filename'], payload['mime_type'],
+                content_hash=payload.get('content_hash')
+            )
+        except FileNotFoundError as e:
+            # The upload is gone, no retry can bring it back
+            raise PermanentJobError(str(e)) from e
+
+    if os.path.exists(payload['local_path']):
+        os.remove(payload['local_path'])
+
+
+def give_up_process_module(payload, error):
+    if isinstance(error, ModuleLeaseHeld):
+        # The lease holder owns the status and the upload
+        print(f"⚠️ Gave up waiting for module {payload['module_id']}: {error}")
+        return
+    db.update_module_status(payload['course_id'], payload['module_id'], f"Failed: {error}", 0)
+    if os.path.exists(payload['local_path']):
+        os.remove(payload['local_path'])
+
+
+def start_processing_workers(size=None):
+    pool = WorkerPool(
+        get_job_queue(),
+        handlers={PROCESS_MODULE: handle_process_module},
+        give_up_handlers={PROCESS_MODULE: give_up_process_module},
+        size=size or Config.PROCESSING_WORKERS
+    )
+    pool.start()
+    print(f"⚙️ Started {pool.size} processing workers.")
+    return pool
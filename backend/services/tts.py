@@ -0,0 +1,143 @@
+# backend/services/tts.py
+"""
+Voiceover synthesis with a content-addressed disk cache.
+
+A script is split into sentences, each sentence is synthesized on its own
+(a few at a time) and cached under sha256(backend, lang, voice, text), and the
+MP3 pieces are concatenated frame-wise into one file. Re-processing a module,
+or a lightly edited script, only synthesizes the sentences that changed.
+
+Backends are looked up by name (Config.TTS_BACKEND): 'gtts' talks to Google,
+'silent' is an offline stub that returns silent MP3 frames sized to the text.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from core.config import Config
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+class GTTSBackend:
+    name = 'gtts'
+
+    def synthesize(self, text, lang, voice):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        # gTTS "voices" are regional Google domains (com, co.uk, co.in, ...)
+        gTTS(text=text, lang=lang, tld=voice or 'com').write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class SilentBackend:
+    """Offline stub: MPEG-1 Layer III, 128 kbps, 44.1 kHz mono, all silence."""
+    name = 'silent'
+    FRAME = b'\xff\xfb\x90\xc4' + b'\x00' * 413  # 1152 samples = ~26 ms
+    CHARS_PER_SECOND = 15
+
+    def synthesize(self, text, lang, voice):
+        seconds = max(len(text) / self.CHARS_PER_SECOND, 0.5)
+        return self.FRAME * int(seconds * 44100 / 1152)
+
+
+_backends = {backend.name: backend for backend in (GTTSBackend(), SilentBackend())}
+
+
+def register_backend(backend):
+    _backends[backend.name] = backend
+
+
+def get_tts_backend(name=None):
+    name = name or Config.TTS_BACKEND
+    if name not in _backends:
+        raise ValueError(f"Unknown TTS backend '{name}'")
+    return _backends[name]
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_RE.split(text or '') if s.strip()]
+
+
+class TTSCache:
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def key(backend_name, text, lang, voice):
+        raw = json.dumps([backend_name, lang, voice, text], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.mp3")
+
+    def get(self, key):
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, audio):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half a file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSCache(Config.TTS_CACHE_DIR)
+    return _cache
+
+
+def synthesize_script(script_text, output_path, lang='en', voice=None, backend=None):
+    """
+    Writes the narration for script_text to output_path (MP3).
+    Returns {"sentences": n, "cached": hits}.
+    """
+    backend = backend or get_tts_backend()
+    cache = get_tts_cache()
+    sentences = split_sentences(script_text)
+    if not sentences:
+        raise ValueError("Nothing to synthesize: the script is empty")
+
+    # 1. Look every sentence up in the cache
+    keys = [cache.key(backend.name, sentence, lang, voice) for sentence in sentences]
+    audio = {key: cache.get(key) for key in set(keys)}
+    missing = [(key, sentence) for key, sentence in dict(zip(keys, sentences)).items() if audio[key] is None]
+
+    # 2. Synthesize the rest, a bounded number at a time
+    def synthesize(item):
+        key, sentence = item
+        data = backend.synthesize(sentence, lang, voice)
+        cache.set(key, data)
+        return key, data
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=Config.TTS_MAX_CONCURRENCY) as pool:
+            audio.update(pool.map(synthesize, missing))
+
+    # 3. MP3 is a stream of self-contained frames, so pieces concatenate as bytes
+    with open(output_path, 'wb') as f:
+        for key in keys:
+            f.write(audio[key])
+
+    hits = len(set(keys)) - len(missing)
+    print(f"🔊 Narration: {len(sentences)} sentences, {hits} from cache")
+    return {"sentences": len(sentences), "cached": hits}
@@ -0,0 +1,94 @@
+# backend/services/video_renderer.py
+"""
+Lecture video rendering with a single ffmpeg process.
+
+A generated lecture is a slow vertical pan over one tall screenshot, so the
+pan is expressed as an ffmpeg crop filter whose y offset is a function of t.
+The encoder does all per-frame work; there are no Python callbacks per frame.
+"""
+import re
+import subprocess
+from core.config import Config
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_SIZE_RE = re.compile(r"Stream #.*?Video:.*?\b(\d{2,5})x(\d{2,5})\b")
+
+# name -> (fps, x264 tune). "still" suits a slow pan over a static slide.
+RENDER_MODES = {
+    "standard": (24, None),
+    "still": (12, "stillimage"),
+}
+
+
+def get_ffmpeg_binary():
+    if Config.FFMPEG_BINARY:
+        return Config.FFMPEG_BINARY
+    try:
+        # Bundled with moviepy's imageio-ffmpeg dependency
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return "ffmpeg"
+
+
+def _stream_info(media_path):
+    # `ffmpeg -i` with no output prints the stream info to stderr (and exits 1)
+    return subprocess.run(
+        [get_ffmpeg_binary(), "-hide_banner", "-i", media_path],
+        capture_output=True, text=True
+    ).stderr
+
+
+def probe_duration(media_path):
+    """Duration in seconds, read from ffmpeg's stream info."""
+    match = _DURATION_RE.search(_stream_info(media_path))
+    if not match:
+        raise ValueError(f"Could not read duration of {media_path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_video_size(media_path):
+    """(width, height) of the first video stream."""
+    match = _VIDEO_SIZE_RE.search(_stream_info(media_path))
+    if not match:
+        raise ValueError(f"Could not read video size of {media_path}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def render_scrolling_video(image_path, audio_path, output_path, width=1280, height=720,
+                           mode=None, preset=None, crf=None):
+    """
+    Pans from the top to the bottom of image_path over the length of the
+    audio and writes an H.264/AAC mp4. Returns the duration in seconds.
+    """
+    mode = mode or Config.LECTURE_RENDER_MODE
+    fps, tune = RENDER_MODES[mode]
+    duration = probe_duration(audio_path)
+
+    # Fit the width, make sure there is at least one full frame of height,
+    # then move the crop window down linearly with time.
+    video_filter = (
+        f"[0:v]scale={width}:-2,"
+        f"pad={width}:'max(ih,{height})':0:0:white,"
+        f"crop={width}:{height}:0:'(ih-{height})*min(t/{duration:.3f},1)',"
+        f"format=yuv420p[v]"
+    )
+    cmd = [
+        get_ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-y",
+        "-loop", "1", "-framerate", str(fps), "-i", image_path,
+        "-i", audio_path,
+        "-filter_complex", video_filter,
+        "-map", "[v]", "-map", "1:a",
+        "-t", f"{duration:.3f}", "-r", str(fps),
+        "-c:v", "libx264", "-preset", preset or Config.LECTURE_X264_PRESET,
+        "-crf", str(crf if crf is not None else Config.LECTURE_X264_CRF),
+    ]
+    if tune:
+        cmd += ["-tune", tune]
+    cmd += ["-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart", output_path]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-1000:]}")
+    return duration
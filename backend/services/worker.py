@@ -0,0 +1,94 @@
+# backend/services/worker.py
+"""
+Standalone processing worker, so video encoding and PDF rendering never run
+inside the API processes.
+
+    python -m services.worker --processes 4 --threads 1
+
+Each process runs its own WorkerPool over the shared job queue; the parent
+only supervises (restarts crashed children, forwards shutdown). Run it from
+the backend directory, like app.py, so media paths resolve the same way.
+
+The worker must run on the same host as the API: the job queue is a local
+SQLite file (JOB_QUEUE_PATH) and jobs read their uploads from the API's
+temp_uploads/ directory. This moves processing out of the API processes,
+not onto other machines.
+"""
+import argparse
+import multiprocessing
+import signal
+import sys
+import time
+from core.config import Config
+
+
+def run_worker_process(threads):
+    from services.processing_jobs import start_processing_workers
+
+    stop = {"requested": False}
+
+    def request_stop(signum, frame):
+        stop["requested"] = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    pool = start_processing_workers(threads)
+    while not stop["requested"]:
+        time.sleep(1)
+
+    # Stop claiming, give running jobs a chance to finish. Anything still
+    # running is picked up again via recover_interrupted / lease expiry.
+    print("🛑 Worker stopping, waiting for running jobs...")
+    pool.stop(timeout=Config.WORKER_SHUTDOWN_GRACE_SECONDS)
+
+
+def supervise(processes, threads):
+    # spawn, not fork: gRPC channels do not survive a fork
+    ctx = multiprocessing.get_context('spawn')
+    children = {}
+    stopping = {"requested": False}
+
+    def start_child(slot):
+        proc = ctx.Process(target=run_worker_process, args=(threads,), name=f"render-worker-{slot}")
+        proc.start()
+        children[slot] = proc
+
+    def request_stop(signum, frame):
+        stopping["requested"] = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for slot in range(processes):
+        start_child(slot)
+    print(f"⚙️ Supervising {processes} worker processes x {threads} threads.")
+
+    while not stopping["requested"]:
+        for slot, proc in list(children.items()):
+            if not proc.is_alive():
+                print(f"♻️ Worker {proc.name} exited with {proc.exitcode}, restarting.")
+                start_child(slot)
+        time.sleep(2)
+
+    for proc in children.values():
+        proc.terminate()  # SIGTERM -> graceful stop in the child
+    for proc in children.values():
+        proc.join(Config.WORKER_SHUTDOWN_GRACE_SECONDS + 5)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SkillChaska processing worker")
+    parser.add_argument('--processes', type=int, default=Config.WORKER_PROCESSES)
+    parser.add_argument('--threads', type=int, default=Config.WORKER_THREADS_PER_PROCESS)
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        run_worker_process(args.threads)
+    else:
+        supervise(args.processes, args.threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,7 @@ interface VideoPlayerProps {
   moduleId: string;
   courseId: string;
   videoUrl: string;
+  hlsUrl?: string | null;
   interactionPoints: InteractionPoint[];
   initialStartTime?: number;
   onComplete?: () => void;
@@ -24,6 +25,7 @@ export const VideoPlayer = ({
   moduleId, 
   courseId, 
   videoUrl,
+  hlsUrl = null,
   interactionPoints,
   initialStartTime = 0, 
   onComplete, 
@@ -52,6 +54,49 @@ export const VideoPlayer = ({
   const videoRef = useRef<HTMLVideoElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
 
+  // --- Source: adaptive HLS where possible, the mp4 otherwise ---
+  useEffect(() => {
+    const video = videoRef.current;
+    if (!video || !videoUrl) return;
+
+    let hls: { destroy: () => void } | null = null;
+    let cancelled = false;
+    const playMp4 = () => {
+      hls?.destroy();
+      hls = null;
+      if (!cancelled) video.src = videoUrl;
+    };
+
+    if (!hlsUrl) {
+      playMp4();
+    } else if (video.canPlayType('application/vnd.apple.mpegurl')) {
+      // Safari (and iOS) play HLS natively
+      video.addEventListener('error', playMp4, { once: true });
+      video.src = hlsUrl;
+    } else {
+      // Loaded on demand so mp4-only lectures don't pay for it
+      import('hls.js').then(({ default: Hls }) => {
+        if (cancelled) return;
+        if (!Hls.isSupported()) return playMp4();
+        const player = new Hls({ startPosition: initialStartTime });
+        player.on(Hls.Events.ERROR, (_event, data) => {
+          if (data.fatal) playMp4();
+        });
+        player.loadSource(hlsUrl);
+        player.attachMedia(video);
+        hls = player;
+      }).catch(playMp4);
+    }
+
+    return () => {
+      cancelled = true;
+      video.removeEventListener('error', playMp4);
+      hls?.destroy();
+    };
+    // initialStartTime only seeds the first load of a source
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [videoUrl, hlsUrl]);
+
   // --- Initial Resume & Event Logic (Same as before, just kept cleaner) ---
   useEffect(() => {
     const video = videoRef.current;
@@ -163,7 +208,6 @@ export const VideoPlayer = ({
     >
       <video 
         ref={videoRef}
-        src={videoUrl}
         className="w-full h-full object-cover"
         onClick={togglePlay}
         playsInline
@@ -19,6 +19,7 @@ const Classroom = () => {
   const [isLoading, setIsLoading] = useState(true);
   const [courseData, setCourseData] = useState<CourseEntity | null>(null);
   const [videoUrl, setVideoUrl] = useState('');
+  const [hlsUrl, setHlsUrl] = useState<string | null>(null);
   const [interactionPoints, setInteractionPoints] = useState<InteractionPoint[]>([]);
   const [currentTime, setCurrentTime] = useState(0);
   const [serverResumeTime, setServerResumeTime] = useState(0);
@@ -44,6 +45,7 @@ const Classroom = () => {
      if (activeCourseId && activeModuleId) {
         learnService.getPlayerContent(activeCourseId, activeModuleId).then(data => {
             setVideoUrl(data.video_url);
+            setHlsUrl(data.hls_url);
             setInteractionPoints(data.interaction_points);
             setServerResumeTime(data.watched_history);
         }).catch(console.error);
@@ -117,7 +119,8 @@ const Classroom = () => {
                   key={activeModuleId} 
                   courseId={activeCourseId}
                   moduleId={activeModuleId}
-                  videoUrl={videoUrl} 
+                  videoUrl={videoUrl}
+                  hlsUrl={hlsUrl} 
                   interactionPoints={interactionPoints} 
                   initialStartTime={serverResumeTime} 
                   onTimeUpdate={setCurrentTime} 
@@ -21,34 +21,53 @@ const Courses = () => {
 
   // State for Real Data
   const [allCourses, setAllCourses] = useState<CourseEntity[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const filters = ["All", "Beginner", "Intermediate", "Pro"];
 
-  // Fetch Courses on Mount
+  // Fetch the first page on mount and whenever the search changes (debounced)
   useEffect(() => {
-    const fetchCourses = async () => {
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      setIsLoading(true);
       try {
-        const data = await courseService.getAll();
-        setAllCourses(data as CourseEntity[]);
+        const page = await courseService.getPage({ search: searchQuery.trim() });
+        if (!cancelled) {
+          setAllCourses(page.courses);
+          setNextCursor(page.nextCursor);
+        }
       } catch (error) {
         console.error("Failed to fetch courses", error);
       } finally {
-        setIsLoading(false);
+        if (!cancelled) setIsLoading(false);
       }
+    }, searchQuery ? 300 : 0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
     };
-    fetchCourses();
-  }, []);
-
-  // Filter Logic
-  const filteredCourses = allCourses.filter((course) => {
-    const matchesSearch = course.course_title
-      .toLowerCase()
-      .includes(searchQuery.toLowerCase());
-    const matchesFilter =
-      activeFilter === "All" || course.course_difficulty === activeFilter;
-    return matchesSearch && matchesFilter;
-  });
+  }, [searchQuery]);
+
+  const loadMore = async () => {
+    if (!nextCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await courseService.getPage({ cursor: nextCursor, search: searchQuery.trim() });
+      setAllCourses((prev) => [...prev, ...page.courses]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to fetch more courses", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  // Filter Logic (search runs on the server, difficulty over the loaded pages)
+  const filteredCourses = allCourses.filter(
+    (course) => activeFilter === "All" || course.course_difficulty === activeFilter
+  );
 
   // Select the "Featured" course (e.g., the first one in the list, or latest)
   const featuredCourse = allCourses.length > 0 ? allCourses[0] : null;
@@ -111,7 +130,7 @@ const Courses = () => {
             <h1 className="text-4xl font-bold">Course Library</h1>
           </div>
           <p className="text-textSecondary">
-            Explore {allCourses.length} professional-grade courses
+            Explore {allCourses.length}{nextCursor ? "+" : ""} professional-grade courses
           </p>
         </div>
 
@@ -189,7 +208,19 @@ const Courses = () => {
         </div>
       )}
 
-      {!isLoading && filteredCourses.length === 0 && (
+      {!isLoading && nextCursor && (
+        <div className="flex justify-center mt-12">
+          <button
+            onClick={loadMore}
+            disabled={isLoadingMore}
+            className="px-8 py-4 bg-surface border border-border rounded-2xl font-bold text-textSecondary hover:text-text hover:border-secondary transition-all disabled:opacity-50"
+          >
+            {isLoadingMore ? "Loading..." : "Load more courses"}
+          </button>
+        </div>
+      )}
+
+      {!isLoading && !nextCursor && filteredCourses.length === 0 && (
         <motion.div
           initial={{ opacity: 0 }}
           animate={{ opacity: 1 }}
@@ -97,8 +97,9 @@ const Dashboard = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const courseData = await courseService.getAll();
-        setCourses(courseData as CourseEntity[]);
+        // First page only; the full library is on /courses
+        const { courses: courseData } = await courseService.getPage();
+        setCourses(courseData);
         // Mock session data for visual if API fails, or use real API
         try {
             const { data } = await apiClient.get('/instructor/sessions');
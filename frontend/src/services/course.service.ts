@@ -8,9 +8,17 @@ const getBaseUrl = () => {
 };
 
 export const courseService = {
-  getAll: async () => {
-    const { data } = await apiClient.get<{data: CourseEntity[]}>('/course');
-    return data.data;
+  // One catalog page; pass the returned nextCursor back to get the next one
+  getPage: async (options: { limit?: number; cursor?: string | null; search?: string } = {}) => {
+    const { limit, cursor, search } = options;
+    const { data } = await apiClient.get<{data: CourseEntity[]; next_cursor: string | null}>('/course', {
+      params: {
+        ...(limit ? { limit } : {}),
+        ...(cursor ? { cursor } : {}),
+        ...(search ? { search } : {})
+      }
+    });
+    return { courses: data.data, nextCursor: data.next_cursor };
   },
 
   getById: async (id: string) => {
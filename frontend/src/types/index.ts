@@ -65,6 +65,7 @@ export interface CourseEntity {
 
 export interface PlayerContentResponse {
   video_url: string;
+  hls_url: string | null;
   interaction_points: InteractionPoint[];
   watched_history: number;
 }